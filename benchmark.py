@@ -0,0 +1,244 @@
+#
+# Benchmark with synthetic redmine issues.
+#
+# A forest of issues with configurable size, depth, branching and date span is served by a local fake redmine
+# ('/issues.json' only), and the gantt chart is generated from it with the normal command line entry point.
+# Time of each phase and counters are got from the metrics of the run and printed as JSON,
+# so it runs offline and the results can be compared across releases.
+#
+# Usage: python benchmark.py --issues 10000 --depth 4 --branching 5 --runs 3 --result bench.jsonl
+#
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openpyxl
+
+import excel_gantt_from_redmine
+from logging_helper import set_console_log_level
+from metrics import metrics
+
+LEAF_TRACKER_ID = 1    # Tracker of the issues which the filter gets, their ancestors are got by ID
+PARENT_TRACKER_ID = 2  # Tracker of the issues which have children
+UPDATED_ON = '2020-01-01T00:00:00Z'
+
+def build_forest(issues: int, depth: int, branching: int, start_date: datetime.date, span: int, seed: int) -> dict:
+    """
+    Build a synthetic issue forest in the form of '/issues.json' response.
+    Trees of the given depth and branching are made until the number of issues is reached.
+
+    Args:
+        issues (int): Number of issues
+        depth (int): Depth of each tree, 1 for trees without children
+        branching (int): Number of children of each parent issue
+        start_date (datetime.date): First start date of issues
+        span (int): Number of days which issues are spread over
+        seed (int): Random seed, the same seed makes the same forest
+
+    Returns:
+        dict: Issues with issue ID as key and issue dictionary as value
+    """
+
+    rng = random.Random(seed)
+    forest = dict()
+
+    def add(parent_id: int|None, level: int) -> None:
+        if len(forest) >= issues:
+            return
+        id = len(forest) + 1
+        start = start_date + datetime.timedelta(days=rng.randrange(span))
+        due = min(start + datetime.timedelta(days=rng.randrange(1, 30)), start_date + datetime.timedelta(days=span-1))
+        issue = {
+            'id': id,
+            'project': {'id': 1, 'name': 'benchmark'},
+            'tracker': {'id': LEAF_TRACKER_ID if level == depth else PARENT_TRACKER_ID},
+            'subject': f'Synthetic issue {id} at level {level}',
+            'assigned_to': {'id': rng.randrange(1, 20), 'name': f'User {rng.randrange(1, 20)}'},
+            'start_date': start.isoformat(),
+            'due_date': due.isoformat(),
+            'done_ratio': rng.randrange(0, 101, 10),
+            'updated_on': UPDATED_ON,
+        }
+        if parent_id is not None:
+            issue['parent'] = {'id': parent_id}
+        forest[id] = issue
+        if level < depth:
+            for _ in range(branching):
+                add(id, level+1)
+
+    while len(forest) < issues:
+        add(None, 1)
+
+    # issues which got no children as the number of issues was reached are leaves, too
+    parents = {issue['parent']['id'] for issue in forest.values() if 'parent' in issue}
+    for id, issue in forest.items():
+        if id not in parents:
+            issue['tracker'] = {'id': LEAF_TRACKER_ID}
+
+    return forest
+
+def start_fake_redmine(forest: dict) -> ThreadingHTTPServer:
+    """
+    Start a local fake redmine which serves '/issues.json' of the forest.
+    It supports issue_id, tracker_id, updated_on, offset and limit parameters.
+
+    Args:
+        forest (dict): Issues to serve
+
+    Returns:
+        ThreadingHTTPServer: Running server, its port is server.server_port
+    """
+
+    issues = list(forest.values())
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            if url.path != '/issues.json':
+                self.send_error(404)
+                return
+            query = dict(urllib.parse.parse_qsl(url.query))
+
+            if 'issue_id' in query:
+                selected = [forest[int(id)] for id in query['issue_id'].split(',') if int(id) in forest]
+            elif 'tracker_id' in query:
+                selected = [issue for issue in issues if str(issue['tracker']['id']) == query['tracker_id']]
+            else:
+                selected = issues
+            if 'updated_on' in query:
+                since = query['updated_on'].lstrip('>=')
+                selected = [issue for issue in selected if issue['updated_on'] >= since]
+
+            offset = int(query.get('offset', 0))
+            limit = int(query.get('limit', 25))
+            body = json.dumps({'issues': selected[offset:offset+limit], 'total_count': len(selected),
+                               'offset': offset, 'limit': limit}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def write_config(path: str, port: int, args: argparse.Namespace) -> None:
+    """
+    Write the configuration file of the benchmark run.
+
+    Args:
+        path (str): Configuration file path
+        port (int): Port of the fake redmine
+        args (argparse.Namespace): Benchmark parameters
+    """
+
+    end_date = args.start_date + datetime.timedelta(days=args.span-1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'''
+redmine.url = "http://127.0.0.1:{port}/"
+redmine.project_name = "benchmark"
+redmine.max_workers = {args.max_workers}
+redmine.filter.tracker_id = "{LEAF_TRACKER_ID}"
+
+spreadsheet.streaming = {'true' if args.streaming else 'false'}
+spreadsheet.grid = "{args.grid}"
+spreadsheet.writer = "{args.writer}"
+spreadsheet.gantt.scale = "{args.scale}"
+spreadsheet.gantt.start_date = "{args.start_date.strftime('%Y/%m/%d')}"
+spreadsheet.gantt.end_date   = "{end_date.strftime('%Y/%m/%d')}"
+''')
+
+def parse_args(argv: list|None=None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list|None): Command line arguments. If None, sys.argv is used.
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+
+    def date(value: str) -> datetime.date:
+        return datetime.datetime.strptime(value, '%Y/%m/%d').date()
+
+    parser = argparse.ArgumentParser(description='Benchmark gantt chart generation with synthetic redmine issues.')
+    parser.add_argument('--issues', type=int, default=5000, help='number of issues (default: 5000)')
+    parser.add_argument('--depth', type=int, default=3, help='depth of each issue tree (default: 3)')
+    parser.add_argument('--branching', type=int, default=5, help='number of children of each parent (default: 5)')
+    parser.add_argument('--start-date', type=date, default=date('2025/01/01'), help="first date in format 'YYYY/MM/DD' (default: 2025/01/01)")
+    parser.add_argument('--span', type=int, default=180, help='number of days of the gantt chart (default: 180)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed of the forest (default: 1)')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs (default: 3)')
+    parser.add_argument('--max-workers', type=int, default=4, help='redmine.max_workers (default: 4)')
+    parser.add_argument('--streaming', action='store_true', help='use spreadsheet.streaming')
+    parser.add_argument('--grid', choices=('cell', 'conditional'), default='cell', help='spreadsheet.grid (default: cell)')
+    parser.add_argument('--writer', choices=('openpyxl', 'xlsxwriter', 'csv', 'json'), default='openpyxl', help='spreadsheet.writer (default: openpyxl)')
+    parser.add_argument('--scale', choices=('day', 'week', 'month', 'auto'), default='day', help='spreadsheet.gantt.scale (default: day)')
+    parser.add_argument('--result', metavar='FILE', help='append the result to the file as a JSON line')
+    return parser.parse_args(argv)
+
+def main(argv: list|None=None) -> int:
+    args = parse_args(argv)
+
+    # only the result is printed
+    set_console_log_level(logging.WARNING)
+
+    forest = build_forest(args.issues, args.depth, args.branching, args.start_date, args.span, args.seed)
+    server = start_fake_redmine(forest)
+
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            config_file = os.path.join(work_dir, 'config.toml')
+            write_config(config_file, server.server_port, args)
+            for _ in range(args.runs):
+                output = os.path.join(work_dir, 'benchmark')
+                result = excel_gantt_from_redmine.main(['--config', config_file, '--output', output, '--quiet'])
+                if result != excel_gantt_from_redmine.EXIT_OK:
+                    print(f'Generation failed with exit code {result}', file=sys.stderr)
+                    return result
+                runs.append(metrics.summary())
+    finally:
+        server.shutdown()
+
+    phases = sorted({name for run in runs for name in run['phases']})
+    report = {
+        'date': datetime.datetime.now().astimezone().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'openpyxl': openpyxl.__version__,
+        'parameters': {key: (value.isoformat() if isinstance(value, datetime.date) else value)
+                       for key, value in vars(args).items() if key != 'result'},
+        'median': {
+            'total': statistics.median(run['total'] for run in runs),
+            'phases': {name: statistics.median(run['phases'].get(name, 0.0) for run in runs) for name in phases},
+        },
+        'counters': runs[-1]['counters'],
+        'runs': runs,
+    }
+
+    line = json.dumps(report)
+    print(line)
+    if args.result is not None:
+        with open(args.result, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,16 @@
 import datetime
+import importlib.util
 import os
 import tomllib
 from logging import getLogger
 
 logger = getLogger(__name__)
 
+SCALES = ('day', 'week', 'month')
+AUTO_WEEK_DAYS  = 186  # 'auto' scale uses weeks for date ranges longer than this (about 6 months)
+AUTO_MONTH_DAYS = 731  # 'auto' scale uses months for date ranges longer than this (about 2 years)
+AUTO_DATE = 'auto'     # start_date/end_date fitted to the dates of the issues
+
 # Configuration handling class
 class Config:
     class Redmine:
@@ -15,6 +21,9 @@ class Config:
             self.login        = None
             self.username     = None
             self.password     = None
+            self.api_key      = None
+            self.max_workers  = 1
+            self.backend      = 'thread'
 
     class Filter:
         def __init__(self):
@@ -28,70 +37,276 @@ class Config:
             self.assigned_to_id   = None
             self.fixed_version_id = None
 
+    class Job:
+        def __init__(self):
+            self.output       = None  # Excel file name to save, None to ask it
+            self.project_name = None
+            self.tab_title    = None
+            self.start_date   = None  # None to fit it to the issues
+            self.end_date     = None  # None to fit it to the issues
+            self.filter       = None  # Config.Filter
+
     def __init__(self):
         self._redmine = self.Redmine()
         self._filtter = self.Filter()
 
         self._font_name  = None
         self._tab_title  = None
+        self._streaming  = None
+        self._grid       = None
+        self._writer     = None
+        self._render_workers = 1
         self._start_date = None
         self._end_date   = None
+        self._scale_setting = None
+        self._padding    = 0
+        self._rollup     = False
+        self._scale      = None
+        self._column_dates = None
         self._holidays   = None
+        self._holiday_mask = None
+        self._cache_dir  = None
+        self._jobs       = None
 
-    def load_config_from_toml(self):
+    def load_config_from_toml(self, config_file: str='config.toml') -> bool:
         """
-        Load configuration from 'config.toml'.
+        Load configuration from the toml file.
+
+        Args:
+            config_file (str): Configuration file path (='config.toml').
+
+        Returns:
+            bool: True if the configuration is loaded successfully
         """
 
-        config_file = 'config.toml' # constant file name
         if os.path.exists(config_file):
-            with open(config_file, 'rb') as f:
-                config = tomllib.load(f)
-
-            redmine = config.get('redmine', {})
-            account = redmine.get('account', {})
-            filter = redmine.get('filter', {})
-            spreadsheet = config.get('spreadsheet', {})
-            gantt = spreadsheet.get('gantt', {})
-
-            self._redmine.url = redmine.get('url', None).strip('/')
-            self._redmine.link_url = self._redmine.url + '/issues/'
-            self._redmine.project_name = redmine.get('project_name', None)
-
-            self._redmine.login = account.get('need_login', False)
-            self._redmine.username = account.get('username', None)
-            self._redmine.password = account.get('password', None)
-
-            self._filtter.sort = filter.get('sort', None)
-            self._filtter.issue_id = filter.get('issue_id', None).replace(' ', '') if filter.get('issue_id', None) else None
-            self._filtter.query_id = filter.get('query_id', None)
-            self._filtter.tracker_id = filter.get('tracker_id', None)
-            self._filtter.status_id = filter.get('status_id', None)
-            self._filtter.assigned_to_id = filter.get('assigned_to_id', None)
-            self._filtter.fixed_version_id = filter.get('fixed_version_id', None)
-
-            self._font_name = spreadsheet.get('font_name', None)
-            self._tab_title = spreadsheet.get('tab_title', None)
-
-            self._start_date = gantt.get('start_date', None)
-            self._end_date = gantt.get('end_date', None)
-
-            self._holidays = config.get('holidays', [])
+            try:
+                with open(config_file, 'rb') as f:
+                    config = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                logger.error(f"config file '{config_file}' is not valid TOML. {e}")
+                return False
+
+            # values of wrong types are reported instead of raising errors
+            try:
+                redmine = config.get('redmine', {})
+                account = redmine.get('account', {})
+                filter = redmine.get('filter', {})
+                cache = config.get('cache', {})
+                spreadsheet = config.get('spreadsheet', {})
+                gantt = spreadsheet.get('gantt', {})
+
+                self._redmine.url = (redmine.get('url', None) or '').strip('/')
+                self._redmine.link_url = self._redmine.url + '/issues/'
+                self._redmine.project_name = redmine.get('project_name', None)
+                self._redmine.max_workers = max(1, int(redmine.get('max_workers', 4)))
+                self._redmine.backend = redmine.get('backend', 'thread')
+
+                self._redmine.login = account.get('need_login', False)
+                self._redmine.username = account.get('username', None)
+                self._redmine.password = account.get('password', None)
+                self._redmine.api_key = account.get('api_key', None)
+
+                self._filtter = self.load_filter(filter)
+
+                self._font_name = spreadsheet.get('font_name', None)
+                self._tab_title = spreadsheet.get('tab_title', None)
+                self._streaming = spreadsheet.get('streaming', False)
+                self._grid = spreadsheet.get('grid', 'cell')
+                self._writer = spreadsheet.get('writer', 'openpyxl')
+                self._render_workers = max(1, int(spreadsheet.get('render_workers', 1)))
+
+                self._start_date = gantt.get('start_date', None)
+                self._end_date = gantt.get('end_date', None)
+                self._scale_setting = gantt.get('scale', 'day')
+                self._padding = max(0, int(gantt.get('padding', 7)))
+                self._rollup = gantt.get('rollup', False)
+
+                self._holidays = config.get('holidays', [])
+
+                self._cache_dir = cache.get('dir', None)
+
+                # Each job inherits the settings above which it doesn't specify, no jobs is one job of them
+                self._jobs = []
+                for job_config in config.get('jobs', None) or [{}]:
+                    job = self.Job()
+                    job.output = job_config.get('output', None)
+                    job.project_name = job_config.get('project_name', self._redmine.project_name)
+                    job.tab_title = job_config.get('tab_title', self._tab_title)
+                    job.start_date = job_config.get('start_date', self._start_date)
+                    job.end_date = job_config.get('end_date', self._end_date)
+                    job.filter = self.load_filter(job_config.get('filter', {}), filter)
+                    self._jobs.append(job)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.error(f"Invalid configuration in '{config_file}' : {e}")
+                return False
         else:
             logger.error(f"config file '{config_file}' not found.")
             return False
 
         # Validate mandatory fields
-        if not all([self._redmine.url, self._redmine.project_name, 
-                    self._start_date, self._end_date]):
+        if not self._redmine.url or not all([all([job.project_name, job.start_date, job.end_date]) for job in self._jobs]):
             logger.error("Missing mandatory configuration fields.")
             return False
 
-        self._start_date = datetime.datetime.strptime(self._start_date, '%Y/%m/%d').date()
-        self._end_date = datetime.datetime.strptime(self._end_date, '%Y/%m/%d').date()
+        # Sheets of one workbook are found by their tab title on --update, excel compares them ignoring case
+        titles = set()
+        for job in self._jobs:
+            title = (job.output, str(job.tab_title or job.project_name).lower())
+            if title in titles:
+                logger.error(f"Jobs have the same tab title '{job.tab_title or job.project_name}' in one output. Set 'tab_title' of the jobs.")
+                return False
+            titles.add(title)
+
+        if self._redmine.backend not in ('thread', 'async'):
+            logger.error(f"Invalid redmine.backend '{self._redmine.backend}'. It must be 'thread' or 'async'.")
+            return False
+
+        if self._redmine.backend == 'async' and importlib.util.find_spec('httpx') is None:
+            logger.error("redmine.backend 'async' needs httpx. Install it with 'pip install httpx'.")
+            return False
+
+        if self._writer not in ('openpyxl', 'xlsxwriter', 'csv', 'json'):
+            logger.error(f"Invalid spreadsheet.writer '{self._writer}'. It must be 'openpyxl', 'xlsxwriter', 'csv' or 'json'.")
+            return False
+
+        if self._writer == 'xlsxwriter' and importlib.util.find_spec('xlsxwriter') is None:
+            logger.error("spreadsheet.writer 'xlsxwriter' needs XlsxWriter. Install it with 'pip install xlsxwriter'.")
+            return False
+
+        if self._scale_setting not in SCALES + ('auto',):
+            logger.error(f"Invalid spreadsheet.gantt.scale '{self._scale_setting}'. It must be 'day', 'week', 'month' or 'auto'.")
+            return False
+
+        if self._grid not in ('cell', 'conditional'):
+            logger.error(f"Invalid spreadsheet.grid '{self._grid}'. It must be 'cell' or 'conditional'.")
+            return False
+
+        try:
+            for job in self._jobs:
+                job.start_date = None if job.start_date == AUTO_DATE else datetime.datetime.strptime(job.start_date, '%Y/%m/%d').date()
+                job.end_date = None if job.end_date == AUTO_DATE else datetime.datetime.strptime(job.end_date, '%Y/%m/%d').date()
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid start_date or end_date, it must be 'YYYY/MM/DD' or 'auto' : {e}")
+            return False
+
+        try:
+            self._holidays = frozenset(
+                h if isinstance(h, datetime.date) else datetime.datetime.strptime(h, '%Y/%m/%d').date()
+                for h in self._holidays)
+        except ValueError as e:
+            logger.error(f"Invalid holiday : {e}")
+            return False
+
+        self.apply_job(self._jobs[0])
 
         return True
 
+    def load_filter(self, filter: dict, base: dict|None=None) -> 'Config.Filter':
+        """
+        Load filter conditions.
+
+        Args:
+            filter (dict): Filter conditions in the configuration
+            base (dict|None): Filter conditions used for the items which 'filter' doesn't have
+
+        Returns:
+            Config.Filter: Filter conditions
+        """
+
+        if base is not None:
+            filter = dict(base, **filter)
+
+        conditions = self.Filter()
+        conditions.sort = filter.get('sort', None)
+        conditions.issue_id = filter.get('issue_id', None).replace(' ', '') if filter.get('issue_id', None) else None
+        conditions.query_id = filter.get('query_id', None)
+        conditions.parent_id = filter.get('parent_id', None)
+        conditions.tracker_id = filter.get('tracker_id', None)
+        conditions.status_id = filter.get('status_id', None)
+        conditions.author_id = filter.get('author_id', None)
+        conditions.assigned_to_id = filter.get('assigned_to_id', None)
+        conditions.fixed_version_id = filter.get('fixed_version_id', None)
+        return conditions
+
+    def apply_job(self, job: 'Config.Job') -> None:
+        """
+        Make the job current, the properties return the settings of the job after this.
+
+        Args:
+            job (Config.Job): Job to apply
+        """
+
+        self._redmine.project_name = job.project_name
+        self._filtter = job.filter
+        self._tab_title = job.tab_title
+        self._start_date = job.start_date
+        self._end_date = job.end_date
+        self.build_calendar()
+
+    def set_date_range(self, start_date: datetime.date, end_date: datetime.date, auto_scale: str|None=None) -> None:
+        """
+        Change the date range of the gantt chart of the current job.
+
+        Args:
+            start_date (datetime.date): Start date
+            end_date (datetime.date): End date
+            auto_scale (str|None): Scale used instead of the one chosen by the length of the date range
+                                   if spreadsheet.gantt.scale is 'auto', e.g. the scale of the sheet to update
+        """
+
+        self._start_date = start_date
+        self._end_date = end_date
+        self.build_calendar(auto_scale)
+
+    def build_calendar(self, auto_scale: str|None=None) -> None:
+        """
+        Build the date columns and the holiday mask for the gantt chart date range.
+        Each column is a day, a week from monday or a month from the 1st, by the scale.
+        Call this again when start_date or end_date is changed.
+        The date range fitted to the issues is unknown until they are got, and there are no columns until then.
+
+        Args:
+            auto_scale (str|None): Scale used if spreadsheet.gantt.scale is 'auto', None to choose it by the date range
+        """
+
+        if self._start_date is None or self._end_date is None:
+            self._scale = None
+            self._column_dates = None
+            self._holiday_mask = None
+            return
+
+        days = (self._end_date - self._start_date).days + 1
+        if self._scale_setting == 'auto' and auto_scale is not None:
+            self._scale = auto_scale
+        elif self._scale_setting == 'auto':
+            self._scale = 'month' if days > AUTO_MONTH_DAYS else 'week' if days > AUTO_WEEK_DAYS else 'day'
+        else:
+            self._scale = self._scale_setting
+
+        dates = []
+        mask = []
+        if self._scale == 'day':
+            d = self._start_date
+            while d <= self._end_date:
+                dates.append(d)
+                # saturday, sunday or holiday
+                mask.append(d.weekday() >= 5 or d in self._holidays)
+                d += datetime.timedelta(days=1)
+        elif self._scale == 'week':
+            d = self._start_date - datetime.timedelta(days=self._start_date.weekday())
+            while d <= self._end_date:
+                dates.append(d)
+                d += datetime.timedelta(days=7)
+        else:
+            d = self._start_date.replace(day=1)
+            while d <= self._end_date:
+                dates.append(d)
+                d = (d + datetime.timedelta(days=31)).replace(day=1)
+        # a week or a month column is never a holiday
+        self._column_dates = tuple(dates)
+        self._holiday_mask = tuple(mask) if mask else (False,) * len(dates)
+
     def input_pw(self, prompt:str='Password: ') -> str:
         """
         Input password
@@ -103,7 +318,12 @@ class Config:
             (str) Entered string
         """
 
-        from msvcrt import getch
+        try:
+            from msvcrt import getch
+        except ImportError:
+            # not Windows
+            from getpass import getpass
+            return getpass(prompt)
 
         print(prompt, end='', flush=True)
 
@@ -126,17 +346,44 @@ class Config:
 
         return buf
 
-    def user_account(self):
-        if self._redmine.login:
-            if not self._redmine.username:
-                username = input('Username: ')
-                self._redmine.username = username
-            if not self._redmine.password:
-                password = self.input_pw()
-                self._redmine.password = password
-        else:
+    def user_account(self, interactive: bool=True) -> bool:
+        """
+        Complete the account information.
+        Empty values are taken from environment variables REDMINE_API_KEY, REDMINE_USERNAME and REDMINE_PASSWORD,
+        and then asked if interactive.
+
+        Args:
+            interactive (bool) : True to ask missing username and password (=True).
+
+        Returns:
+            (bool) False if login is needed but the account information is missing
+        """
+
+        if not self._redmine.login:
             self._redmine.username = None
             self._redmine.password = None
+            self._redmine.api_key = None
+            return True
+
+        self._redmine.api_key = self._redmine.api_key or os.environ.get('REDMINE_API_KEY')
+        if self._redmine.api_key:
+            return True
+
+        self._redmine.username = self._redmine.username or os.environ.get('REDMINE_USERNAME')
+        self._redmine.password = self._redmine.password or os.environ.get('REDMINE_PASSWORD')
+        if not interactive:
+            if not (self._redmine.username and self._redmine.password):
+                logger.error('Redmine account is needed, but neither api_key nor username and password are given.')
+                return False
+            return True
+
+        if not self._redmine.username:
+            username = input('Username: ')
+            self._redmine.username = username
+        if not self._redmine.password:
+            password = self.input_pw()
+            self._redmine.password = password
+        return True
 
     @property
     def url(self):
@@ -162,6 +409,18 @@ class Config:
     def password(self):
         return self._redmine.password
 
+    @property
+    def api_key(self):
+        return self._redmine.api_key
+
+    @property
+    def max_workers(self):
+        return self._redmine.max_workers
+
+    @property
+    def backend(self):
+        return self._redmine.backend
+
     @property
     def sort(self):
         return self._filtter.sort
@@ -206,6 +465,22 @@ class Config:
     def tab_title(self):
         return self._tab_title if self._tab_title else self.project_name
 
+    @property
+    def streaming(self):
+        return self._streaming
+
+    @property
+    def grid(self):
+        return self._grid
+
+    @property
+    def writer(self):
+        return self._writer
+
+    @property
+    def render_workers(self):
+        return self._render_workers
+
     @property
     def start_date(self):
         return self._start_date
@@ -214,7 +489,34 @@ class Config:
     def end_date(self):
         return self._end_date
 
+    @property
+    def padding(self):
+        return self._padding
+
+    @property
+    def rollup(self):
+        return self._rollup
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @property
+    def column_dates(self):
+        return self._column_dates
+
     @property
     def holidays(self):
         return self._holidays
 
+    @property
+    def holiday_mask(self):
+        return self._holiday_mask
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @property
+    def jobs(self):
+        return self._jobs
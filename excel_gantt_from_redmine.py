@@ -5,535 +5,1005 @@
 #   issue_id, subject, assigned_to, start_date, due_date, closed_on, done_ratio
 #
 
+import argparse
+import copy
+import cProfile
 import datetime
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import openpyxl
-from openpyxl.formatting.rule import DataBarRule, FormulaRule
-from openpyxl.styles import Border, Font, PatternFill, Side
-from openpyxl.styles.alignment import Alignment
-from openpyxl.utils.cell import get_column_letter
-from redminelib import Redmine
+from openpyxl.formatting.formatting import ConditionalFormattingList
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.utils.cell import column_index_from_string, get_column_letter
 
 from config import Config
-from issue_dict import IssueData
-from logging_helper import init_logger
+from gantt_styles import GanttStyles
+from gantt_template import header_labels, issue_values
+from gantt_writers import (GanttWriter, create_writer, excel_set_gantt_chart_date, set_conditional_format,
+                           set_grid_conditional_format, set_grid_format, write_issue)
+from hierarchy import build_hierarchy, rollup
+from issue_cache import IssueCache
+from logging_helper import init_logger, set_console_log_level
+from metrics import metrics
+from progress import print_progress, progress
+import redmine_fetch
+from run_state import RunState
+from snapshot import SnapshotReader, SnapshotWriter
 
 # global variables
 config = Config()
-targeted_id = []  # Issue ID list those are extracted to process
-registered_id = []  # Issue ID list those have been registered in excel already
+
+# exit codes
+EXIT_OK           = 0
+EXIT_ERROR        = 1  # No issues found, Redmine error or saving error
+EXIT_CONFIG_ERROR = 2  # Configuration or command line error
+
+PROFILE_TOP = 30  # Number of functions to log with --profile
+
+# Issues updated this long before the last sync are fetched again, for the clock of this machine ahead of the server
+SYNC_MARGIN = datetime.timedelta(minutes=10)
 
 logger = init_logger('excel_gantt_from_redmine', logfile_path='./log/excel_gantt_from_redmine.log')
 
-def is_holiday(date: datetime.date) -> bool:
+def fetch_backend():
+    """
+    Get the module which fetches issues with the configured redmine.backend.
+    Both modules have the same functions and return the same IssueData objects.
+
+    Returns:
+        module: redmine_fetch ('thread') or redmine_fetch_async ('async')
+    """
+
+    if config.backend == 'async':
+        # httpx is needed only by the async backend
+        import redmine_fetch_async
+        return redmine_fetch_async
+    return redmine_fetch
+
+def get_filter_issues(redmine, filter: dict, state: RunState, cache: IssueCache|None=None) -> (dict|None):
+    """
+    Get issues from Redmine according to the specified filter conditions.
+
+    Args:
+        redmine (Redmine): Redmine object
+        filter (dict): Filter conditions for searching issues
+        state (RunState): found issues are added to the target issues of this state
+        cache (IssueCache|None): Issue cache, if specified only issues updated since the last sync are fetched
+    
+    Returns:
+        dict: Dictionary of issues with issue ID as key and IssueData object as value
+        None: If an error occurs during the Redmine API call or no issues are found
+    """
+
+    try:
+        if cache is not None:
+            issues_dict = get_filter_issues_with_cache(redmine, filter, cache)
+        else:
+            # Search filter conditions
+            issues = fetch_backend().fetch_filter_issues(redmine, filter, config.max_workers)
+
+            issues_dict = dict()
+            for issue_data in issues:
+                issues_dict[issue_data.id] = issue_data
+
+        state.targeted_id.update(issues_dict.keys())
+
+        if len(issues_dict) == 0:
+            return None
+        else:
+            return issues_dict
+    except Exception as e:
+        logger.error(f'Redmine error : {e}')
+        return None
+
+def get_filter_issues_with_cache(redmine, filter: dict, cache: IssueCache) -> dict:
     """
-    Check if the given date is a holiday, weekend or weekday.
+    Get issues according to the specified filter conditions through the issue cache.
+    Only issues updated since the last sync of the same filter are fetched from Redmine.
+    All issues are fetched again if the number of issues of the filter differs from the cached result,
+    because deleted issues and issues which can't be seen any more are not found by the update time.
+    Filters sorted by other than the issue ID are always fetched again, because the updated issues may have moved.
 
     Args:
-        date (datetime.date): The date to check.
+        redmine (Redmine): Redmine object
+        filter (dict): Filter conditions for searching issues
+        cache (IssueCache): Issue cache
 
     Returns:
-        bool: True if the date is a holiday, saturday, or sunday, False weekday.
+        dict: Dictionary of issues with issue ID as key and IssueData object as value
     """
 
-    w = date.weekday()  # day of week (0:monday - 6:sunday)
-    if w == 5 or w == 6:
-        return True
-    
-    for h in config.holidays:
-        if date == h:
-            return True
+    filter_key = json.dumps([config.url, filter], sort_keys=True)
+    sync_time = datetime.datetime.now(datetime.UTC)
+
+    # The order of the merged result is the order of the filter only if it is sorted by issue ID
+    # (redmine sorts by 'id:desc' if no sort is specified)
+    sort_key = filter.get('sort', 'id:desc').split(',')[0]
+    sorted_by_id = sort_key in ('id', 'id:asc', 'id:desc')
+
+    ids = None
+    synced = cache.get_sync(filter_key)
+    # query_id can't be combined with other filters
+    if synced is not None and 'query_id' not in filter and sorted_by_id:
+        last_sync, ids = synced
+        updated_on = f'>={(last_sync - SYNC_MARGIN).strftime("%Y-%m-%dT%H:%M:%SZ")}'
+
+        # All issues updated since the last sync, they may not match the filter any more
+        changed = fetch_backend().fetch_filter_issues(redmine, {'status_id': '*', 'updated_on': updated_on}, config.max_workers)
+        # Updated issues which match the filter
+        matched = fetch_backend().fetch_filter_issues(redmine, dict(filter, updated_on=updated_on), config.max_workers)
+        cache.store(changed + matched, sync_time)
+        # Issues cached since the last sync have no other changes
+        cache.touch(last_sync, sync_time)
+        logger.info(f'Updated issues since last sync : {len(changed)}')
+
+        changed_ids = {issue_data.id for issue_data in changed}
+        matched_ids = {issue_data.id for issue_data in matched}
+        cached_ids = set(ids)
+        ids = [id for id in ids if id not in changed_ids or id in matched_ids]
+        ids += [issue_data.id for issue_data in matched if issue_data.id not in cached_ids]
+        ids.sort(reverse=sort_key == 'id:desc')
+
+        total_count = fetch_backend().count_filter_issues(redmine, filter)
+        if total_count != len(ids):
+            logger.info(f'Issues of the filter have changed ({len(ids)} cached, {total_count} found), all issues are fetched.')
+            ids = None
+
+    if ids is None:
+        # First sync of this filter, or the cached result is out of date
+        issues = fetch_backend().fetch_filter_issues(redmine, filter, config.max_workers)
+        cache.store(issues, sync_time)
+        ids = [issue_data.id for issue_data in issues]
+
+    cache.valid_since = sync_time
+    cache.set_sync(filter_key, sync_time, ids)
+
+    return cache.load(ids)
+
+def get_ancestor_issues(redmine, issues_dict: dict, cache: IssueCache|None=None, store: dict|None=None) -> (dict|None):
+    """
+    Get ancestor issues (not only parent) associated with the target issues.
+    Ancestors are resolved level by level, so the number of Redmine API calls
+    depends on the depth of the issue tree, not on the number of ancestors.
+    Children are linked to their parents also if an error occurs, for the issues got until then.
+
+    Args:
+        redmine (Redmine): Redmine object
+        issues_dict (dict): Dictionary of target issues
+        cache (IssueCache|None): Issue cache, if specified ancestors not changed since the last sync are loaded from it
+        store (dict|None): Issues already got in this run, shared by all jobs. Newly got ancestors are added to it.
+
+    Returns:
+        dict: Dictionary of ancestor issues with issue ID as key and IssueData object as value, empty if there are none
+        None: If an error occurs during the Redmine API call
+    """
+
+    ancestors_dict = dict()
+    result = ancestors_dict
+    try:
+        # unknown parents of the current level
+        parent_ids = {issue_data.parent_id for issue_data in issues_dict.values()}
+        parent_ids = [id for id in parent_ids if id is not None and id not in issues_dict]
+
+        progress.start('ancestors')
+        while parent_ids:
+            fetched_dict = dict()
+            if store is not None:
+                # copies, because children are linked to the issues of each job
+                fetched_dict = {id: store[id].copy() for id in parent_ids if id in store}
+            unknown_ids = sorted(id for id in parent_ids if id not in fetched_dict)
+            new_dict = dict()
+            if unknown_ids and cache is not None and cache.valid_since is not None:
+                new_dict = cache.load(unknown_ids, since=cache.valid_since)
+            missing_ids = [id for id in unknown_ids if id not in new_dict]
+            if missing_ids:
+                sync_time = datetime.datetime.now(datetime.UTC)
+                issues = fetch_backend().fetch_issues_by_id(redmine, missing_ids, config.max_workers)
+                if cache is not None:
+                    cache.store(issues, sync_time)
+                for issue_data in issues:
+                    new_dict[issue_data.id] = issue_data
+            if store is not None:
+                for id, issue_data in new_dict.items():
+                    store[id] = issue_data.copy()
+            fetched_dict.update(new_dict)
+            for id in parent_ids:
+                if id not in fetched_dict:
+                    logger.warning(f'Parent issue #{id} is not accessible, its children are handled as topmost issues.')
+            ancestors_dict.update(fetched_dict)
+            progress.update(len(ancestors_dict))
+
+            # go up to the next level
+            parent_ids = {issue_data.parent_id for issue_data in fetched_dict.values()}
+            parent_ids = [id for id in parent_ids if id is not None and id not in issues_dict and id not in ancestors_dict]
+    except Exception as e:
+        logger.error(f'Redmine error : {e}')
+        result = None
+    progress.finish()
+
+    # link children to their parents
+    for d in (issues_dict, ancestors_dict):
+        for id, issue_data in d.items():
+            parent_id = issue_data.parent_id
+            if parent_id in issues_dict:
+                issues_dict[parent_id].add_child(id)
+            elif parent_id in ancestors_dict:
+                ancestors_dict[parent_id].add_child(id)
+            elif parent_id is not None and result is not None:
+                # parent is not accessible
+                issue_data.parent_id = None
+
+    return result
+
+def build_filter() -> dict:
+    """
+    Build filter conditions of the current job for searching issues.
+
+    Returns:
+        dict: Filter conditions
+    """
+
+    filter = {
+        'project_id': config.project_name,
+    }
+    if config.sort:
+        filter['sort'] = config.sort
+    if config.issue_id:
+        filter['issue_id'] = config.issue_id
+    if config.query_id:
+        filter['query_id'] = config.query_id
+    if config.parent_id:
+        filter['parent_id'] = config.parent_id
+    if config.tracker_id:
+        filter['tracker_id'] = config.tracker_id
+    if config.status_id:
+        filter['status_id'] = config.status_id
+    if config.author_id:
+        filter['author_id'] = config.author_id
+    if config.assigned_to_id:
+        filter['assigned_to_id'] = config.assigned_to_id
+    if config.fixed_version_id:
+        filter['fixed_version_id'] = config.fixed_version_id
 
-    return False
+    return filter
 
-def set_title_row(ws) -> None:
+def collect_issues(redmine, state: RunState, cache: IssueCache|None=None, store: dict|None=None) -> (dict|None):
     """
-    Set title row and column width for gantt chart template.
+    Get the target issues of the current job and their ancestors.
 
     Args:
-        ws (worksheet): excel worksheet
+        redmine (Redmine): Redmine object
+        state (RunState): found issues are added to the target issues of this state
+        cache (IssueCache|None): Issue cache
+        store (dict|None): Issues already got in this run, shared by all jobs
+
+    Returns:
+        dict: Dictionary of target and ancestor issues with issue ID as key and IssueData object as value
+        None: If no issues are found, or the ancestors can't be got
     """
 
-    # set height of row
-    # ws.row_dimensions[1].height = 40  # Title row
+    # Get issues according to the specified filter condition
+    with metrics.phase('fetch'):
+        issues_dict = get_filter_issues(redmine, build_filter(), state, cache)
+    if issues_dict is None or len(issues_dict) == 0:
+        logger.info('No issues found with the specified filter.')
+        return None
+    metrics.count('target_issues', len(issues_dict))
+
+    # Number of items that match the search criteria
+    logger.info(f'Total found issues : {len(issues_dict)}')
+
+    if store is not None:
+        for id, issue_data in issues_dict.items():
+            store[id] = issue_data.copy()
+
+    # get ancestor(not only parent) issues associated with the target issues
+    with metrics.phase('ancestors'):
+        ancestors_dict = get_ancestor_issues(redmine, issues_dict, cache, store)
+
+    # the chart would miss the rows under the unresolved ancestors
+    if ancestors_dict is None:
+        logger.error('Ancestor issues could not be got, the gantt chart is not made.')
+        return None
+
+    # marge ancestor dict to issues dict
+    metrics.count('ancestors_resolved', len(ancestors_dict))
+    issues_dict.update(ancestors_dict)
+    ancestors_dict.clear()
 
-    # set column width
-    ws.column_dimensions['A'].width =  8  # Task #
-    ws.column_dimensions['B'].width = 50  # Subject
-    ws.column_dimensions['C'].width = 16  # Assigned
-    ws.column_dimensions['D'].width = 12  # Start Date
-    ws.column_dimensions['E'].width = 12  # Due Date
-    ws.column_dimensions['F'].width = 12  # Closed Date
-    ws.column_dimensions['G'].width = 12  # Done Ratio
+    return issues_dict
 
-    fontname  = config.font_name
+def fit_date_range(job: Config.Job, issues_dict: dict) -> Config.Job:
+    """
+    Fit the date range of the job given as 'auto' to the dates of the issues.
+    The range is from the earliest start date to the latest due or closed date, with spreadsheet.gantt.padding days
+    on both sides. The dates given in the configuration are kept.
 
-    ws.cell(1, 1).value = '#'
-    ws.cell(1, 1).font = Font(name=fontname)
-    ws.cell(1, 1).alignment = Alignment(horizontal='center', vertical='center')
+    Args:
+        job (Config.Job): Job whose start_date or end_date is None
+        issues_dict (dict): Dictionary of target and ancestor issues
 
-    ws.cell(1, 2).value = 'Subject'
-    ws.cell(1, 2).font = Font(name=fontname)
-    ws.cell(1, 2).alignment = Alignment(horizontal='center', vertical='center')
+    Returns:
+        Config.Job: Copy of the job with the fitted date range
+    """
 
-    ws.cell(1, 3).value = 'Assigned'
-    ws.cell(1, 3).font = Font(name=fontname)
-    ws.cell(1, 3).alignment = Alignment(horizontal='center', vertical='center')
+    dates = []
+    for issue_data in issues_dict.values():
+        dates += [d for d in (issue_data.start_date, issue_data.due_date) if d is not None]
+        if issue_data.closed_on is not None:
+            dates.append(issue_data.closed_on.date())
+    if not dates:
+        # no issues have dates, the chart shows only the padding around today
+        dates.append(datetime.date.today())
+
+    padding = datetime.timedelta(days=config.padding)
+    job = copy.copy(job)
+    if job.start_date is None:
+        job.start_date = min(dates) - padding
+    if job.end_date is None:
+        job.end_date = max(dates) + padding
+    # a fixed date on one side may be beyond the issues
+    job.end_date = max(job.start_date, job.end_date)
+
+    logger.info(f'Date range fitted to the issues : {job.start_date} - {job.end_date}')
+    return job
+
+def write_gantt_sheet(writer: GanttWriter, state: RunState, issues_dict: dict) -> None:
+    """
+    Add a gantt chart sheet of the current job to the writer.
 
-    ws.cell(1, 4).value = 'Start'
-    ws.cell(1, 4).font = Font(name=fontname)
-    ws.cell(1, 4).alignment = Alignment(horizontal='center', vertical='center')
+    Args:
+        writer (GanttWriter): writer of spreadsheet.writer
+        state (RunState): bookkeeping of target and registered issues of the job
+        issues_dict (dict): Dictionary of target and ancestor issues
+    """
 
-    ws.cell(1, 5).value = 'Due'
-    ws.cell(1, 5).font = Font(name=fontname)
-    ws.cell(1, 5).alignment = Alignment(horizontal='center', vertical='center')
+    with metrics.phase('header'):
+        writer.add_sheet(config)
+        # Title rows and date rows for gantt chart
+        writer.set_title_row()
 
-    ws.cell(1, 6).value = 'Closed'
-    ws.cell(1, 6).font = Font(name=fontname)
-    ws.cell(1, 6).alignment = Alignment(horizontal='center', vertical='center')
+    t0 = datetime.datetime.now()
 
-    ws.cell(1, 7).value = 'Done(%)'
-    ws.cell(1, 7).font = Font(name=fontname)
-    ws.cell(1, 7).alignment = Alignment(horizontal='center', vertical='center')
+    # Write issues in the order of the issue tree
+    with metrics.phase('hierarchy'):
+        hierarchy = build_hierarchy(issues_dict)
+    if config.rollup:
+        with metrics.phase('rollup'):
+            rollup(hierarchy)
+    rows = 0
+    with metrics.phase('rows'):
+        progress.start('write', len(hierarchy.rows))
+        for done, (issue_data, indent) in enumerate(hierarchy.rows, 1):
+            # each issue once
+            if state.register(issue_data.id):
+                # Not a target issue in this filter should be a parent issue of one of the target issue
+                writer.write_issue(issue_data, indent, not state.is_targeted(issue_data.id))
+                rows += 1
+            progress.update(done)
+        progress.finish()
 
-    # merge cells for title row
-    ws.merge_cells('A1:A2')
-    ws.merge_cells('B1:B2')
-    ws.merge_cells('C1:C2')
-    ws.merge_cells('D1:D2')
-    ws.merge_cells('E1:E2')
-    ws.merge_cells('F1:F2')
-    ws.merge_cells('G1:G2')
+    t1 = datetime.datetime.now()
+    logger.info(f'Total process time : {t1-t0}')
 
-def excel_set_gantt_chart_date(ws) -> None:
+    # Filter and conditional formatting
+    with metrics.phase('conditional_format'):
+        writer.set_conditional_format(3, rows+2)
+    with metrics.phase('grid'):
+        writer.set_grid_format(3, rows+2)
+
+    metrics.count('rows_written', rows)
+    if writer.chart:
+        # title, month and day cells, 7 cells of each issue, and grid cells
+        days = len(config.column_dates)
+        months = len(header_labels(config.scale, config.column_dates))
+        metrics.count('cells_written', 7 + months + days + rows*7 + (rows*days if config.grid == 'cell' else 0))
+
+def cell_date(value) -> (datetime.date|None):
     """
-    Set month and day for gantt chart in excel.
+    Get the date of a cell value, excel dates are read as datetime.
 
     Args:
-        ws (worksheet): excel worksheet
+        value: cell value
+
+    Returns:
+        datetime.date: date of the value
+        None: If the value is not a date
     """
 
-    start_gantt = config.start_date
-    end_gantt = config.end_date
-    fontname = config.font_name
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return None
 
-    # fill color for holidays
-    fillLightPink = PatternFill(patternType='solid', fgColor='ffccff')  # Light Pink
+def column_scale(dates: list) -> (str|None):
+    """
+    Find the scale of the date columns of a sheet.
 
-    column = 8  # H -
-    d = start_gantt
-    while d <= end_gantt:
-        ws.column_dimensions[ get_column_letter(column) ].width = 4
+    Args:
+        dates (list): first date of each column
 
-        # Month
-        if d == start_gantt or d.day == 1:
-            ws.cell(1, column, d)
-            ws.cell(1, column).number_format = 'mm'
-            ws.cell(1, column).font = Font(name=fontname)
-            ws.cell(1, column).alignment = Alignment(horizontal='center', vertical='center')
+    Returns:
+        str: 'day', 'week' or 'month'
+        None: If it can't be told from a single column
+    """
+
+    if len(dates) < 2:
+        return None
+    days = (dates[1] - dates[0]).days
+    return 'day' if days == 1 else 'week' if days == 7 else 'month'
 
-        # Day
-        ws.cell(2, column, d)
-        ws.cell(2, column).number_format = 'dd'
-        ws.cell(2, column).font = Font(name=fontname)
-        ws.cell(2, column).alignment = Alignment(horizontal='center', vertical='center')
+def row_issue_id(ws, row: int) -> (int|None):
+    """
+    Get the issue ID of the row from the hyperlink (or the value) of column A.
+
+    Args:
+        ws (worksheet): excel worksheet
+        row (int): row number
 
-        # fill on holiday column
-        if is_holiday(ws.cell(2, column).value):
-            ws.cell(2, column).fill = fillLightPink
+    Returns:
+        int: Issue ID
+        None: If the row is not an issue row
+    """
 
-        d += datetime.timedelta(days=1)
-        column += 1
+    cell = ws.cell(row, 1)
+    if cell.hyperlink is not None and cell.hyperlink.target:
+        tail = cell.hyperlink.target.rstrip('/').rsplit('/', 1)[-1]
+        if tail.isdigit():
+            return int(tail)
+    return cell.value if isinstance(cell.value, int) else None
 
-def write_issue(ws, issue_data, indent: int, row: int) -> int:
+def update_issue_row(ws, styles: GanttStyles, state: RunState, issue_data, indent: int, row: int) -> bool:
     """
-    Write issue information to the excel worksheet.
+    Rewrite the cells of an existing issue row only if the issue has changed.
 
     Args:
         ws (worksheet): excel worksheet
+        styles (GanttStyles): shared cell styles
+        state (RunState): bookkeeping of target and registered issues
         issue (IssueData): issue object
         indent (int): Indentation level for the issue
-        row (int): Current row number in the worksheet
+        row (int): Row number of the issue
 
     Returns:
-        int: Updated row number after writing the issue
+        bool: True if the row has been rewritten
     """
 
-    fontname = config.font_name
-    linkURLbase = config.link_url
+    state.register(issue_data.id)
 
-    id = issue_data.id
-    if id in registered_id:
-        return row
-    else:
-        registered_id.append(id)
+    values = issue_values(issue_data)
 
-    ws.cell(row, 1).number_format = openpyxl.styles.numbers.FORMAT_GENERAL
-    ws.cell(row, 1).value = issue_data.id
-    ws.cell(row, 1).font = Font(name=fontname, color='0563C1', underline='single')
-    ws.cell(row, 1).alignment = Alignment(horizontal='center', vertical='center')
-    ws.cell(row, 1).hyperlink = f'{linkURLbase}{issue_data.id}'
+    def same(old, new) -> bool:
+        if new == '':
+            return old is None or old == ''
+        if isinstance(new, datetime.datetime):
+            return isinstance(old, datetime.datetime) and old == new
+        if isinstance(new, datetime.date):
+            return cell_date(old) == new
+        return old == new
+
+    subject_style = styles.subject(indent, not state.is_targeted(issue_data.id))
+    changed = ws.cell(row, 2).style != subject_style.name
+    for column, value in enumerate(values, 2):
+        if not same(ws.cell(row, column).value, value):
+            changed = True
+            break
+    if not changed:
+        return False
 
-    ws.cell(row, 2).number_format = openpyxl.styles.numbers.FORMAT_GENERAL
-    ws.cell(row, 2).value = issue_data.subject
-    ws.cell(row, 2).font = Font(name=fontname)
-    ws.cell(row, 2).alignment = Alignment(indent=indent*2, vertical='center')
-    if id not in targeted_id:
-        # This is not a target issue in this filter, it should be a parent issue of one of the target issue
-        ws.cell(row, 2).fill = PatternFill(patternType='solid', fgColor='D9D9D9')
+    for column, value in enumerate(values, 2):
+        ws.cell(row, column).value = value
+    ws.cell(row, 2).style = subject_style
+    return True
 
-    ws.cell(row, 3).number_format = openpyxl.styles.numbers.FORMAT_GENERAL
-    ws.cell(row, 3).value = issue_data.assigned_to if issue_data.assigned_to is not None else ''
-    ws.cell(row, 3).font = Font(name=fontname)
-    ws.cell(row, 3).alignment = Alignment(horizontal='center', vertical='center')
+def update_gantt_sheet(ws, styles: GanttStyles, state: RunState, issues_dict: dict) -> bool:
+    """
+    Update a gantt chart sheet of the previous run in place.
+    Rows are found by the issue ID in column A, only changed issues are rewritten,
+    rows of new and removed issues are inserted and deleted, and date columns are added if the date range has grown.
+    Cells in columns right of the gantt chart are kept, and they move together with their issue row.
+    The cells are moved to their final rows and columns in one pass, as openpyxl moves all cells below
+    on every insert_rows and delete_rows.
 
-    ws.cell(row, 4).number_format = 'yyyy/mm/dd'
-    ws.cell(row, 4).value = issue_data.start_date if issue_data.start_date is not None else ''
-    ws.cell(row, 4).font = Font(name=fontname)
-    ws.cell(row, 4).alignment = Alignment(horizontal='center', vertical='center')
+    Args:
+        ws (worksheet): excel worksheet made by this script
+        styles (GanttStyles): shared cell styles
+        state (RunState): bookkeeping of target and registered issues of the job
+        issues_dict (dict): Dictionary of target and ancestor issues
 
-    ws.cell(row, 5).number_format = 'yyyy/mm/dd'
-    ws.cell(row, 5).value = issue_data.due_date if issue_data.due_date is not None else ''
-    ws.cell(row, 5).font = Font(name=fontname)
-    ws.cell(row, 5).alignment = Alignment(horizontal='center', vertical='center')
+    Returns:
+        bool: False if the sheet is not a gantt chart of this script
+    """
 
-    ws.cell(row, 6).number_format = 'yyyy/mm/dd'
-    ws.cell(row, 6).value = issue_data.closed_on if issue_data.closed_on is not None else ''
-    ws.cell(row, 6).font = Font(name=fontname)
-    ws.cell(row, 6).alignment = Alignment(horizontal='center', vertical='center')
+    start_gantt_column = 8  # H -
 
-    ws.cell(row, 7).number_format = openpyxl.styles.numbers.FORMAT_PERCENTAGE
-    ws.cell(row, 7).value = issue_data.done_ratio / 100 if issue_data.done_ratio is not None else ''
-    ws.cell(row, 7).font = Font(name=fontname)
-    ws.cell(row, 7).alignment = Alignment(horizontal='center', vertical='center')
+    # Date range of the sheet
+    old_start = cell_date(ws.cell(2, start_gantt_column).value)
+    if old_start is None:
+        logger.error(f"Sheet '{ws.title}' is not a gantt chart, it can't be updated.")
+        return False
+    old_dates = [old_start]
+    while (d := cell_date(ws.cell(2, start_gantt_column+len(old_dates)).value)) is not None:
+        old_dates.append(d)
+    old_end_column = start_gantt_column + len(old_dates) - 1
+    old_end = old_dates[-1]
+    old_holiday = [ws.cell(2, c).style == styles.holiday_day.name for c in range(start_gantt_column, old_end_column+1)]
+
+    # The date range only grows, so that no columns are lost.
+    # 'auto' scale keeps the scale of the sheet, the grown range would choose another scale some day.
+    start_date = min(config.start_date, old_start)
+    end_date = max(config.end_date, old_end)
+    config.set_date_range(start_date, end_date, column_scale(old_dates))
+
+    # Columns of the sheet must be the columns of the same scale
+    added_before = config.column_dates.index(old_start) if old_start in config.column_dates else -1
+    if added_before < 0 or list(config.column_dates[added_before:added_before+len(old_dates)]) != old_dates:
+        logger.error(f"Sheet '{ws.title}' has date columns of another scale than '{config.scale}', it can't be updated.")
+        return False
+    added_after = len(config.column_dates) - added_before - len(old_dates)
+    end_gantt_column = start_gantt_column + len(config.column_dates) - 1
+
+    # Issue rows of the sheet
+    existing_ids = []
+    while (id := row_issue_id(ws, 3+len(existing_ids))) is not None:
+        existing_ids.append(id)
+
+    hierarchy = build_hierarchy(issues_dict)
+    if config.rollup:
+        with metrics.phase('rollup'):
+            rollup(hierarchy)
+    position = {issue_data.id: i for i, (issue_data, indent) in enumerate(hierarchy.rows)}
+
+    # Final position of each cell, computed once so that every cell moves a single time.
+    # Rows of removed issues are dropped, rows below the issue rows move by the change of the number of rows,
+    # and the date columns added before and after the old date range move the columns right of them.
+    new_rows = dict()  # old row -> new row of the issue rows which stay
+    placed = set()     # issue IDs of the rows which stay, the first row of an issue if it has several rows
+    for row, id in enumerate(existing_ids, 3):
+        if id in position and id not in placed:
+            new_rows[row] = position[id]+3
+            placed.add(id)
+    below = 3 + len(existing_ids)
+    shift = len(hierarchy.rows) - len(existing_ids)
+
+    moved = dict()
+    for (r, c), cell in ws._cells.items():
+        if r >= below:
+            new_row = r + shift
+        elif r >= 3:
+            new_row = new_rows.get(r)
+            if new_row is None:
+                continue
+        else:
+            new_row = r
+        new_column = c
+        if c >= start_gantt_column:
+            new_column += added_before
+            if c > old_end_column:
+                new_column += added_after
+        if new_row != r or new_column != c:
+            cell.row = new_row
+            cell.column = new_column
+            if cell.hyperlink is not None:
+                cell.hyperlink.ref = cell.coordinate
+        moved[(new_row, new_column)] = cell
+    ws._cells = moved
+
+    if added_before or added_after:
+        # column width of the columns right of the gantt chart
+        widths = [(column_index_from_string(letter), dimension.width) for letter, dimension in ws.column_dimensions.items()
+                  if column_index_from_string(letter) > old_end_column]
+        for column, width in widths:
+            ws.column_dimensions[get_column_letter(column+added_before+added_after)].width = width
+
+    # Month and day rows of the whole date range, month labels are set again to the columns of the new range
+    for c in range(start_gantt_column, end_gantt_column+1):
+        ws.cell(1, c).value = None
+        ws.cell(1, c)._style = StyleArray()
+    excel_set_gantt_chart_date(ws, styles, config)
+
+    # Write rows of new issues, and update the issues which have stayed
+    written = 0
+    for row, (issue_data, indent) in enumerate(hierarchy.rows, 3):
+        if issue_data.id in placed:
+            if update_issue_row(ws, styles, state, issue_data, indent, row):
+                written += 1
+        else:
+            state.register(issue_data.id)
+            write_issue(ws, styles, config, issue_data, indent, not state.is_targeted(issue_data.id), row)
+            if config.grid == 'cell':
+                set_grid_format(ws, styles, config, row, row)
+            written += 1
+    last_row = len(hierarchy.rows) + 2
+
+    # Grid of the new date columns and the columns whose holiday has changed
+    if config.grid == 'cell':
+        columns = [c for c in range(start_gantt_column, end_gantt_column+1)
+                   if not (added_before <= c-start_gantt_column < added_before+len(old_holiday))
+                   or old_holiday[c-start_gantt_column-added_before] != config.holiday_mask[c-start_gantt_column]]
+        if columns:
+            set_grid_format(ws, styles, config, 3, last_row, columns)
+
+    # Replace the conditional formats of gantt chart, others are kept
+    formats = ConditionalFormattingList()
+    for cf in ws.conditional_formatting:
+        min_row = min(cells.min_row for cells in cf.sqref.ranges)
+        min_col = min(cells.min_col for cells in cf.sqref.ranges)
+        if min_row in (2, 3) and (min_col in (5, 7) or start_gantt_column <= min_col <= old_end_column):
+            continue
+        for rule in cf.rules:
+            formats.add(str(cf.sqref), rule)
+    ws.conditional_formatting = formats
+    set_conditional_format(ws, config, 3, last_row)
+    if config.grid == 'conditional':
+        set_grid_conditional_format(ws, config, 3, last_row)
 
-    # If the issue is closed, set the done ratio to 100%
-    if issue_data.closed_on is not None:
-        ws.cell(row, 7).value = 1.0  # 100% complete
+    ws.auto_filter.ref = f'A2:G{last_row}'
 
-    return row+1
+    metrics.count('rows_written', written)
+    logger.info(f"Updated sheet '{ws.title}' : {written} rows written, {len(existing_ids)-len(placed)} rows removed")
+    return True
 
-def set_conditional_format(ws, min_row: int, max_row: int) -> None:
+def excel_file_name(output: str, extension: str='.xlsx') -> str:
     """
-    Set conditional formatting for gantt chart template.
+    Add '.xlsx' extension to the file name if it doesn't have.
 
     Args:
-        ws (worksheet): excel worksheet
-        min_row (int): minimum row number for gantt chart
-        max_row (int): maximum row number for gantt chart
-    """
+        output (str): Excel file name
+        extension (str): Extension of the file format (='.xlsx')
 
-    start_gantt = config.start_date
-    end_gantt = config.end_date
+    Returns:
+        str: Excel file name with extension
+    """
 
-    # progress bar : F
-    r1 = DataBarRule(start_type='num', start_value=0, end_type='num', end_value=1, color='31869B', showValue=True, minLength=0, maxLength=100)
-    range = f'$G${min_row}:$G${max_row}'
-    ws.conditional_formatting.add(range, r1)
+    return output if output.lower().endswith(extension) else output + extension
 
-    # gantt chart : H -
-    # count the number of date columns and find the last column
-    start_gantt_column = 8  # H -
-    days = nColumnGantt = end_gantt - start_gantt
-    nColumnGantt = days.days
-    end_gantt_column = start_gantt_column + nColumnGantt
-
-    # condition 1 : completed part considering progress percentage
-    c1 = '=AND( $D3<=H$2, H$2<=ROUNDDOWN( ($E3-$D3+1)*$G3, 0 )+$D3-1 )'
-    # condition 2 : uncompleted part considering progress percentage
-    c2 = '=AND( $D3<=H$2, H$2<=$E3 )'
-    # condition 3 : task for future
-    c3 = '=AND( $D3<=H$2, H$2<=$E3, TODAY()<H$2 )'
-    # condition 4 : today
-    c4 = '=AND( H$2=TODAY() )'
-    # condition 5 : overdue (due cells)
-    c5 = '=AND( $E3<>"", $E3<TODAY(), $G3<1 )'
-
-    # fromat 1 : fill completed part
-    f1 = PatternFill(patternType='solid', bgColor='8888ff')
-    # formay 2 : fill uncompleted part
-    f2 = PatternFill(patternType='solid', bgColor='ff8888')
-    # format 3 : future task
-    f3 = PatternFill(patternType='solid', bgColor='cccccc')
-    # format 4 : today
-    f4 = PatternFill(patternType='lightGray', fgColor='31869b')
-    # format 5 : overdue (due cells)
-    f5 = PatternFill(patternType='solid', bgColor='ffff88')
-
-    # combine conditions and formats
-    r1 = FormulaRule(formula=[c1] , stopIfTrue=None, fill=f1)
-    r2 = FormulaRule(formula=[c2] , stopIfTrue=None, fill=f2)
-    r3 = FormulaRule(formula=[c3] , stopIfTrue=None, fill=f3)
-    r4 = FormulaRule(formula=[c4] , stopIfTrue=None, fill=f4)
-    r5 = FormulaRule(formula=[c5] , stopIfTrue=None, fill=f5)
-
-    # set conditional format
-    start_cell = f'${'H'}${min_row}'
-    end_cell   = f'${get_column_letter(end_gantt_column)}${max_row}'
-    cells      = start_cell + ':' + end_cell
-    ws.conditional_formatting.add(cells, r1)
-    ws.conditional_formatting.add(cells, r2)
-    ws.conditional_formatting.add(cells, r3)
-    start_cell = f'${'H'}${min_row-1}' # (-1) because including month row
-    end_cell   = f'${get_column_letter(end_gantt_column)}${max_row}'
-    cells      = start_cell + ':' + end_cell
-    ws.conditional_formatting.add(cells, r4)
-    start_cell = f'${'E'}${min_row}' # from due date column
-    end_cell   = f'${'E'}${max_row}' # to due date column
-    cells      = start_cell + ':' + end_cell
-    ws.conditional_formatting.add(cells, r5)
-
-    # fill holiday cells
-    r = min_row
-    fillLightPink = PatternFill(patternType='solid', fgColor='ffdcff')  # Light Pink
-    side = Side(style='thin', color='aaaaaa')
-    border = Border(top=side, bottom=side, left=side, right=side)
-    while r <= max_row:
-        # set_task_format(ws, r)
-        c = start_gantt_column
-        while c <= end_gantt_column:
-            v = ws.cell(2, c).value
-            if is_holiday(v):
-                ws.cell(r, c).fill = fillLightPink
-            ws.cell(r, c).border = border  # set border line to all cells in gantt chart area
-            c += 1
-        r += 1
-
-def get_filter_issues(redmine, filter: dict) -> (dict|None):
+def save_workbook(writer: GanttWriter, output: str|None) -> int:
     """
-    Get issues from Redmine according to the specified filter conditions.
+    Save the gantt chart sheets of the writer.
 
     Args:
-        redmine (Redmine): Redmine object
-        filter (dict): Filter conditions for searching issues
-    
+        writer (GanttWriter): writer of spreadsheet.writer
+        output (str|None): File path to save. If None, the file name is asked interactively.
+
     Returns:
-        dict: Dictionary of issues with issue ID as key and IssueData object as value
-        None: If an error occurs during the Redmine API call or no issues are found
+        int: Exit code (EXIT_OK, or EXIT_ERROR if the file can't be saved)
     """
 
-    global targeted_id
-    try:
-        # Search filter conditions
-        issues = redmine.issue.filter(**filter)
-
-        issues_dict = dict()
-        for issue in issues:
-            issue_data = IssueData()
-            issue_data.id          = issue.id
-            issue_data.subject     = issue.subject
-            issue_data.assigned_to = issue.assigned_to.name if hasattr(issue, 'assigned_to') else None
-            issue_data.start_date  = issue.start_date if hasattr(issue, 'start_date') else None
-            issue_data.due_date    = issue.due_date if hasattr(issue, 'due_date') else None
-            issue_data.closed_on   = issue.closed_on if hasattr(issue, 'closed_on') else None
-            issue_data.done_ratio  = issue.done_ratio if hasattr(issue, 'done_ratio') else None
-            issue_data.parent_id   = issue.parent.id if hasattr(issue, 'parent') else None
-            
-            issues_dict[issue.id] = issue_data
-
-            targeted_id.append(issue.id)
+    extension = writer.extension
 
-        if len(issues_dict) == 0:
-            return None
-        else:
-            return issues_dict
-    except Exception as e:
-        logger.error(f'Redmine error : {e}')
-        return None
+    if output is not None:
+        output = excel_file_name(output, extension)
+        try:
+            with metrics.phase('save'):
+                writer.save(output)
+        except Exception as e:
+            logger.error(f" Error : Can't save to '{output}'. {e}")
+            return EXIT_ERROR
+        metrics.count('bytes_saved', os.path.getsize(output))
+        logger.info(f"Saved to '{output}'.")
+        return EXIT_OK
+
+    while True:
+        print(f" Input file name (It doesn't need '{extension}' extention.) : ", end='')
+        f = input()
+        try:
+            with metrics.phase('save'):
+                writer.save(f'{f}{extension}')
+            metrics.count('bytes_saved', os.path.getsize(f'{f}{extension}'))
+            return EXIT_OK
+        except Exception:
+            logger.error(f" Error : Can't save to '{f}{extension}'.")
+            print(' Do you want to try again? [_/n] : ', end='')
+            yn = input().upper()
+            if yn == 'N':
+                return EXIT_ERROR
 
-def get_ancestor_issues(redmine, issues_dict: dict) -> (dict|None):
+def render_workbook(job_config: Config, output: str|None, sheets: list, update: bool=False) -> int:
     """
-    Get ancestor issues (not only parent) associated with the target issues.
+    Write the gantt chart sheets of the fetched issues to a new workbook and save it.
+    This runs in a worker process of the rendering pool, so everything it needs is given by the arguments.
 
     Args:
-        redmine (Redmine): Redmine object
-        issues_dict (dict): Dictionary of target issues
+        job_config (Config): Configuration to use
+        output (str|None): Excel file path to save. If None, the file name is asked interactively.
+        sheets (list): (Config.Job, RunState, issues dictionary) of each sheet
+        update (bool): True to update the sheets of the existing excel file in place
 
     Returns:
-        dict: Dictionary of ancestor issues with issue ID as key and IssueData object as value
-        None: If an error occurs during the Redmine API call or no ancestor issues are found
+        int: Exit code (EXIT_OK, or EXIT_ERROR if a sheet can't be updated or the file can't be saved)
     """
 
-    try:
-        ancestors_dict = dict()
-
-        for id, issue_data in issues_dict.items():
-            parent_id = issue_data.parent_id
-            if parent_id is not None:
-                if parent_id in issues_dict:
-                    issues_dict[parent_id].children_id.append(id)
-                elif parent_id in ancestors_dict:
-                    ancestors_dict[parent_id].children_id.append(id)
-                else:
-                    while parent_id is not None:
-                        if parent_id in ancestors_dict:
-                            # parent has already existed in ancestors_dict, just add child id
-                            ancestors_dict[parent_id].children_id.append(id)
-                            break
-
-                        parent_issue = redmine.issue.get(parent_id)
-                        parent_data = IssueData()
-                        parent_data.id          = parent_issue.id
-                        parent_data.subject     = parent_issue.subject
-                        parent_data.assigned_to = parent_issue.assigned_to.name if hasattr(parent_issue, 'assigned_to') else None
-                        parent_data.start_date  = parent_issue.start_date if hasattr(parent_issue, 'start_date') else None
-                        parent_data.due_date    = parent_issue.due_date if hasattr(parent_issue, 'due_date') else None
-                        parent_data.closed_on   = parent_issue.closed_on if hasattr(parent_issue, 'closed_on') else None
-                        parent_data.done_ratio  = parent_issue.done_ratio if hasattr(parent_issue, 'done_ratio') else None
-                        parent_data.parent_id   = parent_issue.parent.id if hasattr(parent_issue, 'parent') else None
-                        
-                        ancestors_dict[parent_id] = parent_data
-
-                        ancestors_dict[parent_id].children_id.append(id)
-
-                        id = parent_id                    # re-set id for next loop
-                        parent_id = parent_data.parent_id # re-set parent_id for next loop
-                        pass
-        
-        if len(ancestors_dict) == 0:
-            return None
+    global config
+    config = job_config
+
+    result = EXIT_OK
+    wb = None
+    # only openpyxl can update a workbook, --update is refused with the other writers
+    if update and config.writer == 'openpyxl' and output is not None and os.path.exists(excel_file_name(output)):
+        with metrics.phase('load'):
+            wb = openpyxl.load_workbook(excel_file_name(output))
+    writer = create_writer(config, wb)
+    for job, state, issues_dict in sheets:
+        config.apply_job(job)
+        if wb is not None and config.tab_title in wb.sheetnames:
+            with metrics.phase('update'):
+                if not update_gantt_sheet(wb[config.tab_title], writer.styles, state, issues_dict):
+                    result = EXIT_ERROR
         else:
-            return ancestors_dict
-    except Exception as e:
-        logger.error(f'Redmine error : {e}')
-        return None
+            write_gantt_sheet(writer, state, issues_dict)
 
-def get_topmost_id(id, issues_dict) -> int:
-    topmost_id = id
-    while issues_dict[topmost_id].parent_id is not None:
-        topmost_id = issues_dict[topmost_id].parent_id
-    return topmost_id
+    if save_workbook(writer, output) != EXIT_OK:
+        result = EXIT_ERROR
+    return result
 
-def main() -> None:
-    redmine = Redmine(config.url, username=config.username, password=config.password)
+def render_workbook_worker(*args) -> tuple:
+    """
+    Run render_workbook in a worker process of the rendering pool.
 
-    filter = {
-        'project_id': config.project_name,
-    }
-    if config.sort:
-        filter['sort'] = config.sort
-    if config.issue_id:
-        filter['issue_id'] = config.issue_id
-    if config.query_id:
-        filter['query_id'] = config.query_id
-    if config.parent_id:
-        filter['parent_id'] = config.parent_id
-    if config.tracker_id:
-        filter['tracker_id'] = config.tracker_id
-    if config.status_id:
-        filter['status_id'] = config.status_id
-    if config.author_id:
-        filter['author_id'] = config.author_id
-    if config.assigned_to_id:
-        filter['assigned_to_id'] = config.assigned_to_id
-    if config.fixed_version_id:
-        filter['fixed_version_id'] = config.fixed_version_id
+    Args:
+        args: Arguments of render_workbook
 
-    # Get issues according to the specified filter condition
-    issues_dict = get_filter_issues(redmine, filter)
-    if issues_dict is None or len(issues_dict) == 0:
-        logger.info('No issues found with the specified filter.')
-        return
+    Returns:
+        tuple: (Exit code, timers and counters measured in the worker)
+    """
 
-    # Number of items that match the search criteria
-    total = len(issues_dict)
-    logger.info(f'Total found issues : {total}')
+    # a forked worker has the metrics of the parent process
+    metrics.reset()
+    # progress of the workers would be mixed up
+    progress.set_callback(None)
+    result = render_workbook(*args)
+    return result, metrics.snapshot()
 
-    # get ancestor(not only parent) issues associated with the target issues
-    ancestors_dict = get_ancestor_issues(redmine, issues_dict)
+def generate(output: str|None=None, update: bool=False, dump_snapshot: str|None=None, from_snapshot: str|None=None) -> int:
+    """
+    Generate the gantt charts of all jobs in the loaded configuration and save them.
+    Jobs with the same output are saved to one excel file as separate sheets.
+    All jobs share the redmine connection and the issues already got, so each issue is fetched only once.
+    Workbooks are rendered in a process pool if spreadsheet.render_workers is more than 1,
+    while the issues of the following jobs are being fetched.
 
-    # marge ancestor dict to issues dict
-    if ancestors_dict is not None:
-        issues_dict.update(ancestors_dict)
-        ancestors_dict.clear()
-        # re-calc total issues to process
-        total = len(issues_dict)
+    Args:
+        output (str|None): Excel file path to save the jobs which don't specify their output.
+                           If None, the file name is asked interactively.
+        update (bool): True to update the sheets of existing excel files in place instead of making new files
+        dump_snapshot (str|None): Snapshot file to save the issues of all jobs
+        from_snapshot (str|None): Snapshot file to read the issues of all jobs from, instead of redmine.
+                                  The jobs of the snapshot are taken by the order of the jobs in the configuration.
+
+    Returns:
+        int: Exit code (EXIT_OK, or EXIT_ERROR if no issues are found or a file can't be saved or read)
+    """
+
+    reader = None
+    writer = None
+    try:
+        if from_snapshot is not None:
+            reader = SnapshotReader(from_snapshot)
+            logger.info(f"Issues are read from the snapshot '{from_snapshot}' of {reader.header.get('url')} "
+                        f"created at {reader.header.get('created')}.")
+        if dump_snapshot is not None:
+            writer = SnapshotWriter(dump_snapshot, config.url)
+    except (OSError, ValueError) as e:
+        logger.error(f"Can't open the snapshot file. {e}")
+        if reader is not None:
+            reader.close()
+        return EXIT_ERROR
+
+    backend = None
+    redmine = None
+    cache = None
+    if reader is None:
+        backend = fetch_backend()
+        redmine = backend.create_redmine(config.url, config.username, config.password, config.max_workers, config.api_key)
+        cache = IssueCache(config.cache_dir) if config.cache_dir else None
+
+    # Issues got in this run, shared by all jobs
+    store = dict()
+
+    outputs = [job.output if job.output is not None else output for job in config.jobs]
+    # Number of jobs left for each output, the workbook is saved after its last job
+    remaining = dict()
+    for job_output in outputs:
+        remaining[job_output] = remaining.get(job_output, 0) + 1
+
+    # Rendering in other processes pays off only for several workbooks
+    executor = None
+    if config.render_workers > 1 and len(remaining) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(config.render_workers, len(remaining)))
+    futures = []
+
+    sheets = dict()  # fetched sheets of each output
+    result = EXIT_OK
+    try:
+        for job, job_output in zip(config.jobs, outputs):
+            config.apply_job(job)
+            if len(config.jobs) > 1:
+                logger.info(f"Job '{config.tab_title}'")
+
+            if reader is not None:
+                with metrics.phase('snapshot'):
+                    snapshot_job = reader.read_job()
+                if snapshot_job is None:
+                    logger.error(f"The snapshot '{from_snapshot}' has fewer jobs than the configuration.")
+                    result = EXIT_ERROR
+                    break
+                _, state, issues_dict = snapshot_job
+                if issues_dict is not None:
+                    logger.info(f'Total found issues : {len(state.targeted_id)}')
+                else:
+                    logger.info('No issues found with the specified filter.')
+            else:
+                state = RunState()
+                issues_dict = collect_issues(redmine, state, cache, store)
+
+            # saved before rendering, which changes the state
+            if writer is not None:
+                with metrics.phase('snapshot'):
+                    writer.write_job(config.project_name, config.tab_title, state, issues_dict)
+
+            if issues_dict is None:
+                result = EXIT_ERROR
+            else:
+                if job.start_date is None or job.end_date is None:
+                    job = fit_date_range(job, issues_dict)
+                sheets.setdefault(job_output, []).append((job, state, issues_dict))
+
+            remaining[job_output] -= 1
+            if remaining[job_output] == 0 and job_output in sheets:
+                if executor is not None and job_output is not None:
+                    futures.append(executor.submit(render_workbook_worker, copy.deepcopy(config), job_output, sheets.pop(job_output), update))
+                elif render_workbook(config, job_output, sheets.pop(job_output), update) != EXIT_OK:
+                    result = EXIT_ERROR
+
+        for future in futures:
+            try:
+                worker_result, worker_metrics = future.result()
+                metrics.merge(worker_metrics)
+                if worker_result != EXIT_OK:
+                    result = EXIT_ERROR
+            except Exception as e:
+                logger.error(f'Rendering error : {e}')
+                result = EXIT_ERROR
+    except (OSError, ValueError) as e:
+        logger.error(f"Can't read or write the snapshot file. {e}")
+        result = EXIT_ERROR
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.close()
+        if redmine is not None:
+            backend.close_redmine(redmine)
+        if reader is not None:
+            reader.close()
+        if writer is not None:
+            writer.close()
+
+    return result
+
+def parse_args(argv: list|None=None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv (list|None): Command line arguments. If None, sys.argv is used.
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
 
-    wb = openpyxl.Workbook()
-    ws = wb.worksheets[0]
+    parser = argparse.ArgumentParser(
+        description='Generate an excel gantt chart from redmine issues.',
+        epilog='Credentials can also be given by environment variables '
+               'REDMINE_API_KEY, or REDMINE_USERNAME and REDMINE_PASSWORD.')
+    parser.add_argument('-c', '--config', default='config.toml',
+                        help="configuration file (default: 'config.toml')")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('-o', '--output',
+                        help="excel file to save. If not specified, the file name is asked after generation.")
+    output.add_argument('-u', '--update', metavar='EXISTING',
+                        help="excel file of the previous run to update in place. "
+                             "Excel files of jobs with 'output' are also updated if they exist.")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='display neither progress nor information messages, and never prompt for input')
+    parser.add_argument('--dump-snapshot', metavar='FILE',
+                        help='save the fetched issues of all jobs to the file, to render them again with --from-snapshot')
+    parser.add_argument('--from-snapshot', metavar='FILE',
+                        help='render the issues saved by --dump-snapshot instead of fetching them from redmine')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='append the timing and counter summary of the run to the file as a JSON line')
+    parser.add_argument('--profile', metavar='FILE',
+                        help=f'profile the run, save pstats data to the file and log the top {PROFILE_TOP} functions')
+    return parser.parse_args(argv)
+
+def main(argv: list|None=None) -> int:
+    """
+    Entry point of the command line.
 
-    # Tab title
-    if config.tab_title:
-        ws.title = config.tab_title
+    Args:
+        argv (list|None): Command line arguments. If None, sys.argv is used.
 
-    # Title row
-    set_title_row(ws)
+    Returns:
+        int: Exit code
+    """
 
-    # Set filter
-    # ws.dimensions applies filter to all columns with data
-    # By setting filter before entering dates, we can set filter only on non-date columns
-    # If set after entering dates, filter will also be set on date columns, so it's important to do it here
-    # ws.auto_filter.ref = ws.dimensions
+    args = parse_args(argv)
+    update = args.update is not None
+    if update:
+        args.output = args.update
 
-    # Date row for gantt chart
-    excel_set_gantt_chart_date(ws)
+    if args.quiet:
+        set_console_log_level(logging.WARNING)
 
-    import datetime
-    t0 = datetime.datetime.now()
+    # Progress is displayed only on a terminal
+    progress.set_callback(print_progress if not args.quiet and sys.stdout.isatty() else None)
 
-    row = 3
-    progress = 0
+    if not config.load_config_from_toml(args.config):
+        return EXIT_CONFIG_ERROR
 
-    # Write issues to excel worksheet
-    global registered_id
-    for id, issue_data in issues_dict.items():
-        def display_progress(progress, total):
-            p = int(progress*100/total)
-            print(f'\r [ {p:2}% ] done.', end='')
+    # Prompt only if someone can answer it
+    interactive = not args.quiet and sys.stdin.isatty()
+    # No account is needed to render a snapshot
+    if args.from_snapshot is None and not config.user_account(interactive):
+        return EXIT_CONFIG_ERROR
 
-        if issue_data.id in registered_id:
-            continue
+    if update and config.writer != 'openpyxl':
+        logger.error(f"--update can't be used with spreadsheet.writer '{config.writer}'.")
+        return EXIT_CONFIG_ERROR
 
-        topmost_id = get_topmost_id(id, issues_dict)
-        if topmost_id not in registered_id:
-            row = write_issue(ws, issues_dict[topmost_id], 0, row)
-            progress += 1
-            display_progress(progress, total)
+    if args.output is None and not interactive and any(job.output is None for job in config.jobs):
+        logger.error('--output is needed when running non-interactively.')
+        return EXIT_CONFIG_ERROR
 
-        if topmost_id == id:
-            continue
+    metrics.reset()
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        if profiler is not None:
+            result = profiler.runcall(generate, args.output, update, args.dump_snapshot, args.from_snapshot)
         else:
-            # process children tree recursively
-            def process_children_tree(parent_id: int, indent: int, row: int) -> int:
-                nonlocal progress
-                children_list = issues_dict[parent_id].children_id
-                for child_id in children_list:
-                    if child_id not in registered_id:
-                        row = write_issue(ws, issues_dict[child_id], indent, row)
-                        progress += 1
-                        display_progress(progress, total)
-                    if issues_dict[child_id].children_id:
-                        row = process_children_tree(child_id, indent+1, row)
-                return row
-            row = process_children_tree(topmost_id, 1, row)
+            result = generate(args.output, update, args.dump_snapshot, args.from_snapshot)
+    except Exception as e:
+        logger.exception(f'Unexpected error : {e}')
+        result = EXIT_ERROR
 
-    t1 = datetime.datetime.now()
-    logger.info(f'Total process time : {t1-t0}')
+    if profiler is not None:
+        profiler.dump_stats(args.profile)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        logger.info(f"Profile saved to '{args.profile}'.\n{stream.getvalue()}")
 
-    # Freeze window panes
-    ws.freeze_panes = 'H3'
-    # Set filter
-    ws.auto_filter.ref = f'A2:G{row-1}'
+    write_metrics(args.metrics, result)
 
-    # Conditional formatting
-    set_conditional_format(ws, 3, row-1)
+    return result
 
-    # Save excel
-    while True:
-        print(" Input file name (It doesn't need '.xlsx' extention.) : ", end='')
-        f = input()
+def write_metrics(metrics_file: str|None, result: int) -> None:
+    """
+    Log the summary of timers, counters and peak memory as JSON, and append it to the metrics file.
+
+    Args:
+        metrics_file (str|None): File to append the summary as a JSON line. If None, the summary is only logged.
+        result (int): Exit code of the run
+    """
+
+    summary = dict(finished=datetime.datetime.now().astimezone().isoformat(timespec='seconds'), exit_code=result)
+    summary.update(metrics.summary())
+    line = json.dumps(summary)
+    logger.info(f'Metrics : {line}')
+
+    if metrics_file is not None:
         try:
-            wb.save(f'.\\{f}.xlsx')
-            break
-        except Exception:
-            logger.error(f" Error : Can't save to '{f}.xlsx'.")
-            print(' Do you want to try again? [_/n] : ', end='')
-            yn = input().upper()
-            if yn == 'N':
-                break 
+            with open(metrics_file, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        except OSError as e:
+            logger.error(f"Can't write metrics to '{metrics_file}'. {e}")
 
 if __name__ == '__main__':
-    if config.load_config_from_toml():
-        config.user_account()
-        main()
-
+    sys.exit(main())
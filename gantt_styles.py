@@ -0,0 +1,107 @@
+#
+# Shared cell styles for gantt chart.
+#
+# Each style is registered to the workbook once as a named style, so writing a cell
+# needs only one style assignment instead of building Font/Alignment/PatternFill objects.
+#
+
+from openpyxl.styles import Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.styles.alignment import Alignment
+from openpyxl.styles.numbers import FORMAT_GENERAL, FORMAT_PERCENTAGE
+
+from gantt_template import GanttTemplate
+
+class GanttStyles:
+    def __init__(self, wb, font_name: str|None):
+        """
+        Build named styles from the configuration and register them to the workbook.
+        Styles which the workbook has already are reused.
+
+        Args:
+            wb (Workbook): excel workbook
+            font_name (str|None): font name to use
+        """
+
+        self._wb = wb
+        self._font_name = font_name
+
+        self._font = Font(name=font_name)
+        self._center = Alignment(horizontal='center', vertical='center')
+
+        side = Side(style='thin', color='aaaaaa')
+        border = Border(top=side, bottom=side, left=side, right=side)
+
+        # title row and date rows
+        self.title       = self._add('gantt title', FORMAT_GENERAL)
+        self.year        = self._add('gantt year', 'yyyy')
+        self.month       = self._add('gantt month', 'mm')
+        self.day         = self._add('gantt day', 'dd')
+        self.holiday_day = self._add('gantt holiday day', 'dd', fill=PatternFill(patternType='solid', fgColor='ffccff'))  # Light Pink
+
+        # issue rows
+        self.link        = self._add('gantt link', FORMAT_GENERAL, font=Font(name=font_name, color='0563C1', underline='single'))
+        self.text        = self._add('gantt text', FORMAT_GENERAL)
+        self.date        = self._add('gantt date', 'yyyy/mm/dd')
+        self.ratio       = self._add('gantt ratio', FORMAT_PERCENTAGE)
+
+        # gantt chart area
+        self.grid         = self._add('gantt grid', FORMAT_GENERAL, font=DEFAULT_FONT, alignment=Alignment(), border=border)
+        self.holiday_grid = self._add('gantt holiday grid', FORMAT_GENERAL, font=DEFAULT_FONT, alignment=Alignment(), border=border,
+                                      fill=PatternFill(patternType='solid', fgColor='ffdcff'))  # Light Pink
+
+        self._subjects = dict()
+        self._templates = dict()
+
+    def _add(self, name: str, number_format: str, font=None, alignment=None, fill=None, border=None) -> NamedStyle:
+        # A workbook of the previous run (update mode) has the styles already
+        if name in self._wb.named_styles:
+            return self._wb._named_styles[name]
+
+        style = NamedStyle(name=name,
+                           font=font if font is not None else self._font,
+                           alignment=alignment if alignment is not None else self._center,
+                           fill=fill if fill is not None else PatternFill(),
+                           border=border if border is not None else DEFAULT_BORDER,
+                           number_format=number_format)
+        self._wb.add_named_style(style)
+        return style
+
+    def subject(self, indent: int, ancestor: bool) -> NamedStyle:
+        """
+        Get the style of the subject cell. Styles are made on demand for each indentation level.
+
+        Args:
+            indent (int): Indentation level for the issue
+            ancestor (bool): True if the issue is not a target issue but an ancestor of them
+
+        Returns:
+            NamedStyle: Style of the subject cell
+        """
+
+        key = (indent, ancestor)
+        if key not in self._subjects:
+            name = f'gantt subject {indent}' + (' ancestor' if ancestor else '')
+            fill = PatternFill(patternType='solid', fgColor='D9D9D9') if ancestor else None
+            self._subjects[key] = self._add(name, FORMAT_GENERAL, alignment=Alignment(indent=indent*2, vertical='center'), fill=fill)
+        return self._subjects[key]
+
+    def template(self, scale: str, column_dates: tuple, holiday_mask: tuple) -> GanttTemplate:
+        """
+        Get the date header and grid skeleton of the date columns. It is made once for each date columns and holidays,
+        and shared by all sheets of the workbook.
+
+        Args:
+            scale (str): 'day', 'week' or 'month' column
+            column_dates (tuple): first date of each column
+            holiday_mask (tuple): True for holiday of each column
+
+        Returns:
+            GanttTemplate: Header and column styles of the date columns
+        """
+
+        key = (scale, column_dates, holiday_mask)
+        if key not in self._templates:
+            self._templates[key] = GanttTemplate(self, scale, column_dates, holiday_mask)
+        return self._templates[key]
@@ -0,0 +1,200 @@
+#
+# Layout, date header and grid skeleton of gantt chart.
+#
+# The columns, the values of the issue rows and the conditional formats are described here once,
+# and every excel writer draws the chart from them with its own library.
+#
+# The month/day header cells and the style of each date column depend only on the date columns, the holidays
+# and the styles of the workbook, so they are made once and reused by every sheet and every row with the same key.
+# Cells get a copy of the style array of the named style instead of the named style itself:
+# assigning a named style makes openpyxl compare it with all named styles of the workbook for every cell,
+# which was most of the time of styling the grid.
+#
+
+from copy import copy
+
+from openpyxl.utils.cell import get_column_letter
+
+HOLIDAY_SHEET_TITLE = 'holidays'  # Hidden worksheet for the holiday list
+HOLIDAY_LIST_NAME = 'gantt_holidays'  # Defined name of the holiday list
+
+# colors of the conditional formats
+PROGRESS_BAR_COLOR = '31869B'
+COMPLETED_COLOR    = '8888ff'
+UNCOMPLETED_COLOR  = 'ff8888'
+FUTURE_COLOR       = 'cccccc'
+TODAY_COLOR        = '31869b'  # lightGray pattern
+OVERDUE_COLOR      = 'ffff88'
+HOLIDAY_GRID_COLOR = 'ffdcff'  # Light Pink
+GRID_LINE_COLOR    = 'aaaaaa'
+
+# title and width of the columns left of the gantt chart (A - G)
+TITLE_COLUMNS = (('#', 8), ('Subject', 50), ('Assigned', 16), ('Start', 12), ('Due', 12), ('Closed', 12), ('Done(%)', 12))
+DATE_COLUMN_WIDTH = 4
+
+class GanttTemplate:
+    def __init__(self, styles, scale: str, column_dates: tuple, holiday_mask: tuple):
+        """
+        Make the header and the column styles of the date columns.
+
+        Args:
+            styles (GanttStyles): cell styles of the workbook
+            scale (str): 'day', 'week' or 'month' column
+            column_dates (tuple): first date of each column
+            holiday_mask (tuple): True for holiday of each column
+        """
+
+        self.scale = scale
+        self.dates = list(column_dates)
+
+        # upper row : month on the first column and the first column of each month (year for month scale)
+        # lower row : day of the column (month for month scale)
+        self.labels = header_labels(scale, self.dates)
+        if scale == 'month':
+            self.label_style = styles.year.as_tuple()
+            self.day_styles  = [styles.month.as_tuple()] * len(self.dates)
+        else:
+            self.label_style = styles.month.as_tuple()
+            # fill on holiday columns
+            self.day_styles  = [(styles.holiday_day if holiday else styles.day).as_tuple() for holiday in holiday_mask]
+
+        self.grid_styles = [(styles.holiday_grid if holiday else styles.grid).as_tuple() for holiday in holiday_mask]
+
+def header_labels(scale: str, dates: list) -> list:
+    """
+    Find the columns which show the month (the year for month scale) in the upper header row.
+
+    Args:
+        scale (str): 'day', 'week' or 'month' column
+        dates (list): first date of each column
+
+    Returns:
+        list: Indexes of the columns, the first column and the first column of each month (year)
+    """
+
+    if scale == 'month':
+        return [i for i, d in enumerate(dates) if i == 0 or d.month == 1]
+    return [i for i, d in enumerate(dates) if i == 0 or d.month != dates[i-1].month]
+
+def bar_formulas(scale: str) -> tuple:
+    """
+    Make the formulas of the conditional formats of gantt chart for the first issue row (row 3) and column H.
+
+    Args:
+        scale (str): 'day', 'week' or 'month' column
+
+    Returns:
+        tuple: Formulas of completed part, uncompleted part, future task, today and overdue (due cells)
+    """
+
+    # last date of the column, a column is filled if the task overlaps the days from H$2 to it
+    column_end = {'day': 'H$2', 'week': 'H$2+6', 'month': 'EOMONTH(H$2,0)'}[scale]
+
+    # condition 1 : completed part considering progress percentage
+    c1 = f'=AND( $D3<={column_end}, H$2<=ROUNDDOWN( ($E3-$D3+1)*$G3, 0 )+$D3-1 )'
+    # condition 2 : uncompleted part considering progress percentage
+    c2 = f'=AND( $D3<={column_end}, H$2<=$E3 )'
+    # condition 3 : task for future
+    c3 = f'=AND( $D3<={column_end}, H$2<=$E3, TODAY()<H$2 )'
+    # condition 4 : today
+    if scale == 'day':
+        c4 = '=AND( H$2=TODAY() )'
+    else:
+        c4 = f'=AND( H$2<=TODAY(), TODAY()<={column_end} )'
+    # condition 5 : overdue (due cells)
+    c5 = '=AND( $E3<>"", $E3<TODAY(), $G3<1 )'
+
+    return c1, c2, c3, c4, c5
+
+def chart_formats(config, min_row: int, max_row: int) -> list:
+    """
+    Make the conditional formats of gantt chart, in the order of priority.
+
+    Args:
+        config (Config): configuration of the sheet
+        min_row (int): minimum row number for gantt chart
+        max_row (int): maximum row number for gantt chart
+
+    Returns:
+        list: (cell range, formula, format name) of each format,
+              format name is 'completed', 'uncompleted', 'future', 'today' or 'overdue'
+    """
+
+    end_column = get_column_letter(7 + len(config.column_dates))
+    c1, c2, c3, c4, c5 = bar_formulas(config.scale)
+    cells = f'H{min_row}:{end_column}{max_row}'
+    return [(cells, c1, 'completed'),
+            (cells, c2, 'uncompleted'),
+            (cells, c3, 'future'),
+            (f'H{min_row-1}:{end_column}{max_row}', c4, 'today'),  # (-1) because including day row
+            (f'E{min_row}:E{max_row}', c5, 'overdue')]           # due date column
+
+def grid_formats(config, min_row: int, max_row: int) -> list:
+    """
+    Make the conditional formats of the holiday fill and the border line of gantt chart area (spreadsheet.grid = "conditional").
+    They must be added after chart_formats, so that the bars take priority over holiday fill.
+
+    Args:
+        config (Config): configuration of the sheet
+        min_row (int): minimum row number for gantt chart
+        max_row (int): maximum row number for gantt chart
+
+    Returns:
+        list: (cell range, formula, format name) of each format, format name is 'holiday_fill' or 'grid_line'
+    """
+
+    cells = f'H{min_row}:{get_column_letter(7 + len(config.column_dates))}{max_row}'
+    formats = []
+    # a week or a month column is never a holiday
+    if config.scale == 'day':
+        formats.append((cells, holiday_formula(bool(config.holidays)), 'holiday_fill'))
+    formats.append((cells, '=TRUE', 'grid_line'))
+    return formats
+
+def issue_values(issue_data) -> list:
+    """
+    Make the values of the columns B - G of the issue row. Missing values are '', and closed issues are 100% done.
+
+    Args:
+        issue_data (IssueData): issue
+
+    Returns:
+        list: subject, assigned to, start date, due date, closed date and done ratio
+    """
+
+    done_ratio = issue_data.done_ratio / 100 if issue_data.done_ratio is not None else ''
+    # If the issue is closed, set the done ratio to 100%
+    if issue_data.closed_on is not None:
+        done_ratio = 1.0  # 100% complete
+    return [issue_data.subject,
+            issue_data.assigned_to if issue_data.assigned_to is not None else '',
+            issue_data.start_date if issue_data.start_date is not None else '',
+            issue_data.due_date if issue_data.due_date is not None else '',
+            issue_data.closed_on if issue_data.closed_on is not None else '',
+            done_ratio]
+
+def holiday_formula(has_holidays: bool) -> str:
+    """
+    Make the formula of the conditional format of holiday columns (day scale only).
+
+    Args:
+        has_holidays (bool): True if the holiday list 'gantt_holidays' is defined
+
+    Returns:
+        str: Formula of saturday, sunday or holiday
+    """
+
+    if has_holidays:
+        return f'=OR( WEEKDAY(H$2,2)>5, COUNTIF({HOLIDAY_LIST_NAME},H$2)>0 )'
+    return '=WEEKDAY(H$2,2)>5'
+
+def set_style(cell, style_array) -> None:
+    """
+    Set the style of the cell by the style array of a named style, see GanttTemplate.
+
+    Args:
+        cell (Cell): excel cell
+        style_array (StyleArray): style array of a named style registered to the workbook of the cell
+    """
+
+    cell._style = copy(style_array)
@@ -0,0 +1,711 @@
+#
+# Writers of gantt chart.
+#
+# A writer gets the sheets one by one: add_sheet() with the job applied, set_title_row(), write_issue() of each row
+# in the order of the issue tree, set_conditional_format() and set_grid_format() after the rows,
+# and writes the file by save(filename) like openpyxl Workbook, so the same code draws and saves all formats.
+#   'openpyxl'   : excel gantt chart written by openpyxl, in write-only mode with spreadsheet.streaming
+#   'xlsxwriter' : the same gantt chart written by XlsxWriter in constant_memory mode (needs xlsxwriter)
+#   'csv'        : timeline rows of all sheets in one CSV file, for dashboards
+#   'json'       : timeline rows and the date range of each sheet in one JSON file, for dashboards
+# The layout of the chart (columns, row values and conditional formats) is made by gantt_template.
+# Updating an existing workbook is done only with openpyxl, by the functions for a worksheet in this file.
+#
+
+import copy
+import csv
+import json
+from abc import ABC, abstractmethod
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import DataBarRule, FormulaRule
+from openpyxl.styles import Border, PatternFill, Side
+from openpyxl.utils.cell import get_column_letter
+from openpyxl.workbook.defined_name import DefinedName
+
+from gantt_styles import GanttStyles
+from gantt_template import (COMPLETED_COLOR, DATE_COLUMN_WIDTH, FUTURE_COLOR, GRID_LINE_COLOR, HOLIDAY_GRID_COLOR,
+                            HOLIDAY_LIST_NAME, HOLIDAY_SHEET_TITLE, OVERDUE_COLOR, PROGRESS_BAR_COLOR, TITLE_COLUMNS,
+                            TODAY_COLOR, UNCOMPLETED_COLOR, chart_formats, grid_formats, header_labels, issue_values,
+                            set_style)
+
+# columns of the timeline
+TIMELINE_FIELDS = ('sheet', 'id', 'parent_id', 'level', 'subject', 'assigned_to',
+                   'start_date', 'due_date', 'closed_on', 'done_ratio', 'ancestor', 'url')
+
+JSON_VERSION = 1  # Version of the JSON timeline format
+
+MAX_SHEET_LINKS = 65530  # Maximum number of hyperlinks in a sheet of excel
+
+# fill colors of the conditional formats by format name of gantt_template
+CONDITIONAL_FILLS = {
+    'completed':    COMPLETED_COLOR,
+    'uncompleted':  UNCOMPLETED_COLOR,
+    'future':       FUTURE_COLOR,
+    'overdue':      OVERDUE_COLOR,
+    'holiday_fill': HOLIDAY_GRID_COLOR,
+}
+
+class GanttWriter(ABC):
+    extension = ''  # File extension of the format
+    chart = True    # False for the formats without header and grid cells
+
+    def __init__(self, config):
+        """
+        Create the writer.
+
+        Args:
+            config (Config): configuration, spreadsheet settings (font, grid and holidays) are used for all sheets
+        """
+
+        self._settings = copy.copy(config)
+        self.config = None  # configuration of the current sheet
+
+    def add_sheet(self, config) -> None:
+        """
+        Start a sheet (gantt chart of a job).
+
+        Args:
+            config (Config): configuration with the job of the sheet applied, it is copied
+        """
+
+        self.config = copy.copy(config)
+
+    def set_title_row(self) -> None:
+        """
+        Write the title row, the date rows and the column width of the sheet, before the issue rows.
+        """
+
+    @abstractmethod
+    def write_issue(self, issue_data, indent: int, ancestor: bool) -> None:
+        """
+        Write the next issue row of the sheet.
+
+        Args:
+            issue_data (IssueData): issue
+            indent (int): Indentation level for the issue
+            ancestor (bool): True if the issue is not a target issue but an ancestor of them
+        """
+
+    def set_conditional_format(self, min_row: int, max_row: int) -> None:
+        """
+        Set the filter and the conditional formatting of gantt chart, after the issue rows.
+
+        Args:
+            min_row (int): minimum row number for gantt chart
+            max_row (int): maximum row number for gantt chart
+        """
+
+    def set_grid_format(self, min_row: int, max_row: int) -> None:
+        """
+        Set holiday fill and border line to gantt chart area, after set_conditional_format.
+
+        Args:
+            min_row (int): minimum row number for gantt chart
+            max_row (int): maximum row number for gantt chart
+        """
+
+    @abstractmethod
+    def save(self, filename: str) -> None:
+        """
+        Write all sheets to the file.
+
+        Args:
+            filename (str): File path to save
+        """
+
+def formula_rule(name: str, formula: str) -> FormulaRule:
+    """
+    Make the openpyxl rule of a conditional format of gantt_template.
+
+    Args:
+        name (str): format name of the conditional format
+        formula (str): formula of the condition
+
+    Returns:
+        FormulaRule: rule of the format
+    """
+
+    if name == 'today':
+        return FormulaRule(formula=[formula], stopIfTrue=None, fill=PatternFill(patternType='lightGray', fgColor=TODAY_COLOR))
+    if name == 'grid_line':
+        side = Side(style='thin', color=GRID_LINE_COLOR)
+        return FormulaRule(formula=[formula], stopIfTrue=None, border=Border(top=side, bottom=side, left=side, right=side))
+    return FormulaRule(formula=[formula], stopIfTrue=None, fill=PatternFill(patternType='solid', bgColor=CONDITIONAL_FILLS[name]))
+
+def set_title_row(ws, styles: GanttStyles) -> None:
+    """
+    Set title row and column width for gantt chart template.
+
+    Args:
+        ws (worksheet): excel worksheet
+        styles (GanttStyles): shared cell styles
+    """
+
+    for column, (title, width) in enumerate(TITLE_COLUMNS, 1):
+        ws.column_dimensions[get_column_letter(column)].width = width
+        ws.cell(1, column).value = title
+        ws.cell(1, column).style = styles.title
+
+        # merge cells for title row
+        ws.merge_cells(start_row=1, start_column=column, end_row=2, end_column=column)
+
+def excel_set_gantt_chart_date(ws, styles: GanttStyles, config) -> None:
+    """
+    Set month and day for gantt chart in excel.
+
+    Args:
+        ws (worksheet): excel worksheet
+        styles (GanttStyles): shared cell styles
+        config (Config): configuration of the sheet
+    """
+
+    template = styles.template(config.scale, config.column_dates, config.holiday_mask)
+
+    column = 8  # H -
+    for i, d in enumerate(template.dates):
+        ws.column_dimensions[ get_column_letter(column+i) ].width = DATE_COLUMN_WIDTH
+
+        # Day (fill on holiday column)
+        set_style(ws.cell(2, column+i, d), template.day_styles[i])
+
+    # Month (year for month scale)
+    for i in template.labels:
+        set_style(ws.cell(1, column+i, template.dates[i]), template.label_style)
+
+def write_issue(ws, styles: GanttStyles, config, issue_data, indent: int, ancestor: bool, row: int) -> None:
+    """
+    Write issue information to the row of the excel worksheet.
+
+    Args:
+        ws (worksheet): excel worksheet
+        styles (GanttStyles): shared cell styles
+        config (Config): configuration of the sheet
+        issue_data (IssueData): issue object
+        indent (int): Indentation level for the issue
+        ancestor (bool): True if the issue is not a target issue but an ancestor of them
+        row (int): Row number of the issue
+    """
+
+    ws.cell(row, 1).value = issue_data.id
+    ws.cell(row, 1).style = styles.link
+    ws.cell(row, 1).hyperlink = f'{config.link_url}{issue_data.id}'
+
+    # Not a target issue in this filter should be a parent issue of one of the target issue
+    column_styles = (styles.subject(indent, ancestor), styles.text, styles.date, styles.date, styles.date, styles.ratio)
+    for column, (value, style) in enumerate(zip(issue_values(issue_data), column_styles), 2):
+        ws.cell(row, column).value = value
+        ws.cell(row, column).style = style
+
+def set_conditional_format(ws, config, min_row: int, max_row: int) -> None:
+    """
+    Set conditional formatting for gantt chart template.
+
+    Args:
+        ws (worksheet): excel worksheet
+        config (Config): configuration of the sheet
+        min_row (int): minimum row number for gantt chart
+        max_row (int): maximum row number for gantt chart
+    """
+
+    # progress bar : G
+    r1 = DataBarRule(start_type='num', start_value=0, end_type='num', end_value=1, color=PROGRESS_BAR_COLOR, showValue=True, minLength=0, maxLength=100)
+    ws.conditional_formatting.add(f'G{min_row}:G{max_row}', r1)
+
+    # gantt chart : H - , and overdue (due cells)
+    for cells, formula, name in chart_formats(config, min_row, max_row):
+        ws.conditional_formatting.add(cells, formula_rule(name, formula))
+
+def set_grid_format(ws, styles: GanttStyles, config, min_row: int, max_row: int, columns: list|None=None) -> None:
+    """
+    Set holiday fill and border line to all cells in gantt chart area.
+
+    Args:
+        ws (worksheet): excel worksheet
+        styles (GanttStyles): shared cell styles
+        config (Config): configuration of the sheet
+        min_row (int): minimum row number for gantt chart
+        max_row (int): maximum row number for gantt chart
+        columns (list|None): column numbers to set, all date columns if None
+    """
+
+    start_gantt_column = 8  # H -
+    end_gantt_column = start_gantt_column + len(config.column_dates) - 1
+    if columns is None:
+        columns = range(start_gantt_column, end_gantt_column+1)
+
+    # style of each date column, fill holiday cells
+    column_styles = styles.template(config.scale, config.column_dates, config.holiday_mask).grid_styles
+
+    r = min_row
+    while r <= max_row:
+        for c in columns:
+            # set border line to all cells in gantt chart area
+            set_style(ws.cell(r, c), column_styles[c-start_gantt_column])
+        r += 1
+
+def set_grid_conditional_format(ws, config, min_row: int, max_row: int) -> None:
+    """
+    Set holiday fill and border line to gantt chart area by conditional formatting.
+    It costs only a few rules regardless of the number of rows and columns, instead of styling every cell.
+    The rules must be added after the rules of the gantt chart, so that the bars take priority over holiday fill.
+
+    Args:
+        ws (worksheet): excel worksheet
+        config (Config): configuration of the sheet
+        min_row (int): minimum row number for gantt chart
+        max_row (int): maximum row number for gantt chart
+    """
+
+    for cells, formula, name in grid_formats(config, min_row, max_row):
+        ws.conditional_formatting.add(cells, formula_rule(name, formula))
+
+def add_holiday_sheet(wb, config) -> None:
+    """
+    Add a hidden worksheet listing the holidays, and define the name 'gantt_holidays' for the list.
+    The conditional format of the grid refers to this name to find holidays.
+
+    Args:
+        wb (workbook): excel workbook
+        config (Config): configuration
+    """
+
+    # the list of the previous run is replaced when a workbook is updated
+    if HOLIDAY_SHEET_TITLE in wb.sheetnames:
+        wb.remove(wb[HOLIDAY_SHEET_TITLE])
+
+    ws = wb.create_sheet(HOLIDAY_SHEET_TITLE)
+    for h in sorted(config.holidays):
+        ws.append([h])
+    ws.sheet_state = 'hidden'
+
+    if config.holidays:
+        ref = f"'{HOLIDAY_SHEET_TITLE}'!$A$1:$A${len(config.holidays)}"
+        wb.defined_names[HOLIDAY_LIST_NAME] = DefinedName(HOLIDAY_LIST_NAME, attr_text=ref)
+
+class OpenpyxlGanttWriter(GanttWriter):
+    extension = '.xlsx'
+
+    def __init__(self, config, wb=None):
+        """
+        Create the writer with a new workbook, or with the workbook of the previous run to add sheets to (--update).
+
+        Args:
+            config (Config): configuration, spreadsheet settings (font, grid, holidays and streaming) are used for all sheets
+            wb (Workbook|None): workbook to add sheets to, a new workbook if None
+        """
+
+        super().__init__(config)
+
+        if wb is None:
+            if config.streaming:
+                # Rows are written out as soon as they are appended, so memory doesn't grow with the number of issues
+                wb = openpyxl.Workbook(write_only=True)
+            else:
+                wb = openpyxl.Workbook()
+                # sheets are created for each job
+                wb.remove(wb.worksheets[0])
+        self.wb = wb
+
+        # Cell styles shared by all cells
+        self.styles = GanttStyles(wb, config.font_name)
+
+        self._holidays_added = False
+
+    def add_sheet(self, config) -> None:
+        super().add_sheet(config)
+
+        self._ws = self.wb.create_sheet()
+        # Tab title
+        if config.tab_title:
+            self._ws.title = config.tab_title
+        self._row = 3
+        self._grid_cells = []
+
+    def set_title_row(self) -> None:
+        # Freeze window panes
+        self._ws.freeze_panes = 'H3'
+
+        if self.wb.write_only:
+            self._set_title_rows_streaming()
+
+            # Grid is drawn by conditional formatting, so rows don't need styled cells for it
+            if self.config.grid == 'cell':
+                self._grid_cells = self._gantt_grid_cells()
+        else:
+            # Title row
+            set_title_row(self._ws, self.styles)
+
+            # Date row for gantt chart
+            excel_set_gantt_chart_date(self._ws, self.styles, self.config)
+
+    def _set_title_rows_streaming(self) -> None:
+        """
+        Set title rows, column width and merged cells in write-only worksheet.
+        Everything written at the top of the sheet must be set before the issue rows are appended.
+        """
+
+        ws = self._ws
+        styles = self.styles
+        template = styles.template(self.config.scale, self.config.column_dates, self.config.holiday_mask)
+
+        def header_cell(value, style) -> WriteOnlyCell:
+            cell = WriteOnlyCell(ws, value)
+            cell.style = style
+            return cell
+
+        month_row = []
+        for column, (title, width) in enumerate(TITLE_COLUMNS, 1):
+            ws.column_dimensions[get_column_letter(column)].width = width
+            month_row.append(header_cell(title, styles.title))
+
+            # merge cells for title row
+            ws.merged_cells.add(f'{get_column_letter(column)}1:{get_column_letter(column)}2')
+        month_row += [None] * len(template.dates)
+        day_row = [None] * 7
+
+        column = 8  # H -
+        for i, d in enumerate(template.dates):
+            ws.column_dimensions[ get_column_letter(column+i) ].width = DATE_COLUMN_WIDTH
+
+            # Day (fill on holiday column)
+            cell = WriteOnlyCell(ws, d)
+            set_style(cell, template.day_styles[i])
+            day_row.append(cell)
+
+        # Month (year for month scale)
+        for i in template.labels:
+            cell = WriteOnlyCell(ws, template.dates[i])
+            set_style(cell, template.label_style)
+            month_row[7+i] = cell
+
+        ws.append(month_row)
+        ws.append(day_row)
+
+    def _gantt_grid_cells(self) -> list:
+        """
+        Make styled empty cells for gantt chart area of one row in write-only worksheet.
+        The cells are reused for every row because a row is written out as soon as it is appended.
+
+        Returns:
+            list: Cells for date columns
+        """
+
+        template = self.styles.template(self.config.scale, self.config.column_dates, self.config.holiday_mask)
+
+        cells = []
+        for style in template.grid_styles:
+            cell = WriteOnlyCell(self._ws)
+            # set border line to all cells in gantt chart area, and fill holiday cells
+            set_style(cell, style)
+            cells.append(cell)
+
+        return cells
+
+    def write_issue(self, issue_data, indent: int, ancestor: bool) -> None:
+        if not self.wb.write_only:
+            write_issue(self._ws, self.styles, self.config, issue_data, indent, ancestor, self._row)
+            self._row += 1
+            return
+
+        ws = self._ws
+        styles = self.styles
+
+        link = WriteOnlyCell(ws, issue_data.id)
+        link.style = styles.link
+        link.hyperlink = f'{self.config.link_url}{issue_data.id}'
+
+        # Not a target issue in this filter should be a parent issue of one of the target issue
+        column_styles = (styles.subject(indent, ancestor), styles.text, styles.date, styles.date, styles.date, styles.ratio)
+        cells = [link]
+        for value, style in zip(issue_values(issue_data), column_styles):
+            cell = WriteOnlyCell(ws, value)
+            cell.style = style
+            cells.append(cell)
+
+        ws.append(cells + self._grid_cells)
+        self._row += 1
+
+    def set_conditional_format(self, min_row: int, max_row: int) -> None:
+        # Set filter
+        self._ws.auto_filter.ref = f'A{min_row-1}:G{max_row}'
+
+        set_conditional_format(self._ws, self.config, min_row, max_row)
+
+    def set_grid_format(self, min_row: int, max_row: int) -> None:
+        if self.config.grid == 'conditional':
+            set_grid_conditional_format(self._ws, self.config, min_row, max_row)
+        elif not self.wb.write_only:
+            # Grid cells have already been appended with each row in streaming mode
+            set_grid_format(self._ws, self.styles, self.config, min_row, max_row)
+
+    def save(self, filename: str) -> None:
+        # The conditional format of the grid refers to the holiday list by name
+        if self._settings.grid == 'conditional' and not self._holidays_added:
+            add_holiday_sheet(self.wb, self._settings)
+            self._holidays_added = True
+
+        self.wb.save(filename)
+
+class XlsxGanttWriter(GanttWriter):
+    extension = '.xlsx'
+
+    def __init__(self, config):
+        super().__init__(config)
+
+        # xlsxwriter is needed only by this writer
+        import xlsxwriter
+
+        # Rows are written out as soon as the next row is started, so memory doesn't grow with the number of issues.
+        # The file name is given on saving.
+        self._wb = xlsxwriter.Workbook(None, {'constant_memory': True})
+        self._formats = self._add_formats(self._wb, config.font_name)
+        self._subjects = dict()
+
+    def _add_formats(self, wb, font_name: str|None) -> dict:
+        """
+        Add the cell formats and the formats of the conditional formats, the same as GanttStyles and formula_rule.
+
+        Args:
+            wb (xlsxwriter.Workbook): workbook
+            font_name (str|None): font name to use
+
+        Returns:
+            dict: Formats by name
+        """
+
+        font = {'font_name': font_name} if font_name else {}
+        center = dict(font, align='center', valign='vcenter')
+        grid = {'border': 1, 'border_color': '#' + GRID_LINE_COLOR}
+
+        self._font = font
+        formats = {
+            # title row and date rows
+            'title':        wb.add_format(center),
+            'year':         wb.add_format(dict(center, num_format='yyyy')),
+            'month':        wb.add_format(dict(center, num_format='mm')),
+            'day':          wb.add_format(dict(center, num_format='dd')),
+            'holiday_day':  wb.add_format(dict(center, num_format='dd', pattern=1, fg_color='#ffccff')),
+            # issue rows
+            'link':         wb.add_format(dict(center, font_color='#0563C1', underline=1)),
+            'text':         wb.add_format(center),
+            'date':         wb.add_format(dict(center, num_format='yyyy/mm/dd')),
+            'ratio':        wb.add_format(dict(center, num_format='0%')),
+            # gantt chart area
+            'grid':         wb.add_format(grid),
+            'holiday_grid': wb.add_format(dict(grid, pattern=1, fg_color='#' + HOLIDAY_GRID_COLOR)),
+            # conditional formats
+            'today':        wb.add_format({'pattern': 4, 'fg_color': '#' + TODAY_COLOR}),  # lightGray
+            'grid_line':    wb.add_format(grid),
+            # holiday list
+            'holiday':      wb.add_format({'num_format': 'yyyy/mm/dd'}),
+        }
+        for name, color in CONDITIONAL_FILLS.items():
+            formats[name] = wb.add_format({'bg_color': '#' + color})
+        return formats
+
+    def _subject(self, indent: int, ancestor: bool):
+        key = (indent, ancestor)
+        if key not in self._subjects:
+            subject = dict(self._font, indent=indent*2, valign='vcenter')
+            if ancestor:
+                subject.update(pattern=1, fg_color='#D9D9D9')
+            self._subjects[key] = self._wb.add_format(subject)
+        return self._subjects[key]
+
+    def add_sheet(self, config) -> None:
+        super().add_sheet(config)
+
+        self._ws = self._wb.add_worksheet(config.tab_title or None)
+        self._row = 2  # 0-based row number
+
+        # set border line to all cells in gantt chart area, and fill holiday cells
+        self._grid = []
+        if config.grid == 'cell':
+            self._grid = [self._formats['holiday_grid'] if holiday else self._formats['grid'] for holiday in config.holiday_mask]
+
+    def set_title_row(self) -> None:
+        ws = self._ws
+        formats = self._formats
+        config = self.config
+        dates = config.column_dates
+
+        # set column width
+        for column, (title, width) in enumerate(TITLE_COLUMNS):
+            ws.set_column(column, column, width)
+        ws.set_column(7, 7 + len(dates) - 1, DATE_COLUMN_WIDTH)
+
+        # Freeze window panes
+        ws.freeze_panes(2, 7)
+
+        # Title row and month row (year for month scale), rows must be written from the top in constant_memory mode
+        for column, (title, width) in enumerate(TITLE_COLUMNS):
+            ws.write(0, column, title, formats['title'])
+        label = formats['year'] if config.scale == 'month' else formats['month']
+        for i in header_labels(config.scale, dates):
+            ws.write_datetime(0, 7+i, dates[i], label)
+
+        # Day row (month for month scale), fill on holiday column
+        for column in range(7):
+            ws.write_blank(1, column, None, formats['title'])
+        for i, d in enumerate(dates):
+            if config.scale == 'month':
+                day = formats['month']
+            else:
+                day = formats['holiday_day'] if config.holiday_mask[i] else formats['day']
+            ws.write_datetime(1, 7+i, d, day)
+
+        # merge cells for title row
+        # merge_range() writes the second row before the first row is finished, which constant_memory mode doesn't allow
+        for column in range(7):
+            ws.merge.append([0, column, 1, column])
+
+    def write_issue(self, issue_data, indent: int, ancestor: bool) -> None:
+        ws = self._ws
+        formats = self._formats
+        row = self._row
+
+        # the ID is written as a plain number after the hyperlinks reach the limit of excel
+        if ws.hlink_count < MAX_SHEET_LINKS:
+            ws.write_url(row, 0, f'{self.config.link_url}{issue_data.id}', formats['link'], string=str(issue_data.id))
+        else:
+            ws.write_number(row, 0, issue_data.id, formats['link'])
+
+        # Not a target issue in this filter should be a parent issue of one of the target issue
+        column_formats = (self._subject(indent, ancestor), formats['text'], formats['date'], formats['date'], formats['date'], formats['ratio'])
+        for column, (value, format) in enumerate(zip(issue_values(issue_data), column_formats), 1):
+            # '' is written as a blank cell with the format
+            ws.write(row, column, value, format)
+
+        for i, format in enumerate(self._grid):
+            ws.write_blank(row, 7+i, None, format)
+        self._row += 1
+
+    def set_conditional_format(self, min_row: int, max_row: int) -> None:
+        ws = self._ws
+
+        # Set filter
+        ws.autofilter(min_row-2, 0, max_row-1, 6)
+
+        # progress bar : G
+        ws.conditional_format(f'G{min_row}:G{max_row}', {'type': 'data_bar', 'bar_color': '#' + PROGRESS_BAR_COLOR,
+                                                         'min_type': 'num', 'min_value': 0, 'max_type': 'num', 'max_value': 1})
+        # gantt chart : H - , and overdue (due cells)
+        for cells, formula, name in chart_formats(self.config, min_row, max_row):
+            ws.conditional_format(cells, {'type': 'formula', 'criteria': formula, 'format': self._formats[name]})
+
+    def set_grid_format(self, min_row: int, max_row: int) -> None:
+        # Grid cells have already been written with each row
+        if self.config.grid == 'conditional':
+            for cells, formula, name in grid_formats(self.config, min_row, max_row):
+                self._ws.conditional_format(cells, {'type': 'formula', 'criteria': formula, 'format': self._formats[name]})
+
+    def save(self, filename: str) -> None:
+        config = self._settings
+        if config.grid == 'conditional' and HOLIDAY_SHEET_TITLE not in self._wb.sheetnames:
+            # The conditional format of the grid refers to the holiday list by name
+            ws = self._wb.add_worksheet(HOLIDAY_SHEET_TITLE)
+            for row, h in enumerate(sorted(config.holidays)):
+                ws.write_datetime(row, 0, h, self._formats['holiday'])
+            ws.hide()
+            if config.holidays:
+                self._wb.define_name(HOLIDAY_LIST_NAME, f"='{HOLIDAY_SHEET_TITLE}'!$A$1:$A${len(config.holidays)}")
+
+        self._wb.filename = filename
+        self._wb.close()
+
+def timeline_row(config, issue_data, indent: int, ancestor: bool) -> dict:
+    """
+    Make a timeline row of the issue. Dates are in ISO format, and closed issues are 100% done.
+
+    Args:
+        config (Config): configuration of the sheet
+        issue_data (IssueData): issue
+        indent (int): Indentation level for the issue
+        ancestor (bool): True if the issue is not a target issue but an ancestor of them
+
+    Returns:
+        dict: Values of TIMELINE_FIELDS
+    """
+
+    def iso(value):
+        return value.isoformat() if value is not None else None
+
+    return {
+        'sheet': config.tab_title,
+        'id': issue_data.id,
+        'parent_id': issue_data.parent_id,
+        'level': indent,
+        'subject': issue_data.subject,
+        'assigned_to': issue_data.assigned_to,
+        'start_date': iso(issue_data.start_date),
+        'due_date': iso(issue_data.due_date),
+        'closed_on': iso(issue_data.closed_on),
+        'done_ratio': 100 if issue_data.closed_on is not None else issue_data.done_ratio,
+        'ancestor': ancestor,
+        'url': f'{config.link_url}{issue_data.id}',
+    }
+
+class CsvGanttWriter(GanttWriter):
+    extension = '.csv'
+    chart = False
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._rows = []
+
+    def write_issue(self, issue_data, indent: int, ancestor: bool) -> None:
+        self._rows.append(timeline_row(self.config, issue_data, indent, ancestor))
+
+    def save(self, filename: str) -> None:
+        with open(filename, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self._rows)
+
+class JsonGanttWriter(GanttWriter):
+    extension = '.json'
+    chart = False
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._sheets = []
+
+    def add_sheet(self, config) -> None:
+        super().add_sheet(config)
+
+        # the settings of the job are got now, the configuration is changed by the next job
+        self._sheets.append({
+            'title': config.tab_title,
+            'project_name': config.project_name,
+            'start_date': config.start_date.isoformat(),
+            'end_date': config.end_date.isoformat(),
+            'scale': config.scale,
+            'rows': [],
+        })
+
+    def write_issue(self, issue_data, indent: int, ancestor: bool) -> None:
+        row = timeline_row(self.config, issue_data, indent, ancestor)
+        del row['sheet']
+        self._sheets[-1]['rows'].append(row)
+
+    def save(self, filename: str) -> None:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'version': JSON_VERSION, 'sheets': self._sheets}, f, ensure_ascii=False)
+
+def create_writer(config, wb=None) -> GanttWriter:
+    """
+    Create the writer of spreadsheet.writer.
+
+    Args:
+        config (Config): configuration
+        wb (Workbook|None): openpyxl workbook of the previous run to add sheets to (--update), a new file if None
+
+    Returns:
+        GanttWriter: Writer
+    """
+
+    if config.writer == 'openpyxl':
+        return OpenpyxlGanttWriter(config, wb)
+    return {'xlsxwriter': XlsxGanttWriter, 'csv': CsvGanttWriter, 'json': JsonGanttWriter}[config.writer](config)
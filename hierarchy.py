@@ -0,0 +1,156 @@
+#
+# Build the issue forest and the row order of the gantt chart.
+#
+# Rows are ordered by topmost issue in the order they first appear in the issue dictionary,
+# and each topmost issue is followed by its descendants in depth-first order.
+#
+# Optionally the dates and the done ratio of the parent issues are rolled up from their descendants,
+# because redmine keeps those of the ancestors as they were set, which are often stale.
+#
+
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+class Hierarchy:
+    def __init__(self):
+        self.roots = list()  # Topmost issue IDs in row order
+        self.root  = dict()  # Topmost issue ID of each issue
+        self.depth = dict()  # Depth (indentation level) of each issue, 0 for topmost issues
+        self.rows  = list()  # (IssueData, indent) in row order
+
+def build_hierarchy(issues_dict: dict) -> Hierarchy:
+    """
+    Build the issue forest from parent_id of the issues without recursion.
+    Issues whose parent is missing, or which are in a cycle of parents, are handled as topmost issues.
+    Children are ordered as they appear in the issue dictionary.
+
+    Args:
+        issues_dict (dict): Dictionary of issues with issue ID as key and IssueData object as value
+
+    Returns:
+        Hierarchy: Topmost issue and depth of each issue, and the row order
+    """
+
+    hierarchy = Hierarchy()
+    root = hierarchy.root
+    depth = hierarchy.depth
+
+    # Find topmost issue and depth of each issue, every parent chain is walked only once
+    for id in issues_dict:
+        path = []
+        on_path = set()
+        current = id
+        while current not in root:
+            parent_id = issues_dict[current].parent_id
+            if parent_id is None:
+                root[current] = current
+                depth[current] = 0
+                break
+            if parent_id not in issues_dict:
+                logger.warning(f'Parent issue #{parent_id} of #{current} is missing, #{current} is handled as topmost issue.')
+                root[current] = current
+                depth[current] = 0
+                break
+            if parent_id == current or parent_id in on_path:
+                logger.warning(f'Issue #{current} is in a cycle of parent issues, it is handled as topmost issue.')
+                root[current] = current
+                depth[current] = 0
+                break
+            path.append(current)
+            on_path.add(current)
+            current = parent_id
+
+        # resolve the walked issues from the nearest one to the topmost
+        while path:
+            child_id = path.pop()
+            parent_id = issues_dict[child_id].parent_id
+            root[child_id] = root[parent_id]
+            depth[child_id] = depth[parent_id] + 1
+
+    # Topmost issues in the order they first appear, and the children of each issue
+    seen = set()
+    children = dict()
+    for id in issues_dict:
+        root_id = root[id]
+        if root_id not in seen:
+            seen.add(root_id)
+            hierarchy.roots.append(root_id)
+        if root_id != id:
+            children.setdefault(issues_dict[id].parent_id, []).append(id)
+
+    # Depth-first order of each tree
+    emitted = set()
+    for root_id in hierarchy.roots:
+        stack = [(root_id, 0)]
+        while stack:
+            id, indent = stack.pop()
+            if id in emitted:
+                continue
+            emitted.add(id)
+            hierarchy.rows.append((issues_dict[id], indent))
+            # push children in reverse order to pop them in the original order
+            for child_id in reversed(children.get(id, ())):
+                stack.append((child_id, indent+1))
+
+    return hierarchy
+
+def rollup(hierarchy: Hierarchy) -> int:
+    """
+    Replace the start date, due date and done ratio of each issue with children in the hierarchy
+    by those of its descendants, in one bottom-up pass over the rows.
+    The start date is the earliest start date and the due date is the latest due date of the descendants,
+    the done ratio is the average of the leaf issues weighted by their days (1 day if the dates are not set).
+    Closed leaf issues are 100% done. Dates are kept if no descendants have them.
+
+    Args:
+        hierarchy (Hierarchy): Built hierarchy, its issues are changed in place
+
+    Returns:
+        int: Number of issues rolled up
+    """
+
+    rows = hierarchy.rows
+
+    # Parent row of each row, the nearest row above with one less indent
+    parent = [None] * len(rows)
+    stack = []  # row of each indent on the current path
+    for i, (issue_data, indent) in enumerate(rows):
+        del stack[indent:]
+        parent[i] = stack[-1] if stack else None
+        stack.append(i)
+
+    # Descendants of each row, accumulated while the rows are visited from the bottom
+    start_date = [None] * len(rows)
+    due_date   = [None] * len(rows)
+    done_days  = [0.0] * len(rows)  # sum of done ratio * days of the leaf issues
+    days       = [0] * len(rows)    # sum of days of the leaf issues
+
+    rolled = 0
+    for i in range(len(rows)-1, -1, -1):
+        issue_data = rows[i][0]
+        if days[i]:
+            # days is positive only if the issue has children
+            if start_date[i] is not None:
+                issue_data.start_date = start_date[i]
+            if due_date[i] is not None:
+                issue_data.due_date = due_date[i]
+            issue_data.done_ratio = round(done_days[i] / days[i])
+            rolled += 1
+            start, due, done, span = issue_data.start_date, issue_data.due_date, done_days[i], days[i]
+        else:
+            start, due = issue_data.start_date, issue_data.due_date
+            span = (due - start).days + 1 if start is not None and due is not None and start <= due else 1
+            ratio = 100 if issue_data.closed_on is not None else issue_data.done_ratio or 0
+            done = ratio * span
+
+        p = parent[i]
+        if p is not None:
+            if start is not None and (start_date[p] is None or start < start_date[p]):
+                start_date[p] = start
+            if due is not None and (due_date[p] is None or due_date[p] < due):
+                due_date[p] = due
+            done_days[p] += done
+            days[p] += span
+
+    return rolled
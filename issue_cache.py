@@ -0,0 +1,155 @@
+#
+# Persistent on-disk issue cache.
+#
+# Issues are stored in SQLite keyed by issue ID with the time when they were fetched (synced_at).
+# For each filter, the time of the last sync and the ordered issue ID list of the result are stored,
+# so that the next run only needs to get issues updated since the last sync.
+#
+
+import datetime
+import json
+import os
+import sqlite3
+
+from issue_dict import IssueData
+
+CACHE_FILE_NAME = 'issues.sqlite3'
+
+class IssueCache:
+    def __init__(self, cache_dir: str):
+        """
+        Open (or create) the issue cache in the specified directory.
+
+        Args:
+            cache_dir (str): Directory for the cache file. The directory will be created if it does not exist.
+        """
+
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self._conn = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE_NAME))
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS issues ('
+            ' id INTEGER PRIMARY KEY, subject TEXT, assigned_to TEXT,'
+            ' start_date TEXT, due_date TEXT, closed_on TEXT, done_ratio INTEGER,'
+            ' parent_id INTEGER, updated_on TEXT, synced_at TEXT)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS syncs (filter_key TEXT PRIMARY KEY, last_sync TEXT, issue_ids TEXT)')
+        self._conn.commit()
+
+        # Cached issues fetched at or after this time are up to date in this run
+        self.valid_since = None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get_sync(self, filter_key: str) -> (tuple|None):
+        """
+        Get the last sync information of the filter.
+
+        Args:
+            filter_key (str): Key which identifies the filter
+
+        Returns:
+            tuple: (last sync time (datetime.datetime), ordered issue ID list of the filter result)
+            None: If the filter has not been synced yet
+        """
+
+        row = self._conn.execute('SELECT last_sync, issue_ids FROM syncs WHERE filter_key = ?', (filter_key,)).fetchone()
+        if row is None:
+            return None
+        return datetime.datetime.fromisoformat(row[0]), json.loads(row[1])
+
+    def set_sync(self, filter_key: str, last_sync: datetime.datetime, issue_ids: list) -> None:
+        """
+        Store the sync information of the filter.
+
+        Args:
+            filter_key (str): Key which identifies the filter
+            last_sync (datetime.datetime): Time when the sync has started
+            issue_ids (list): Ordered issue ID list of the filter result
+        """
+
+        self._conn.execute('INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)',
+                           (filter_key, last_sync.isoformat(), json.dumps(issue_ids)))
+        self._conn.commit()
+
+    def store(self, issues: list, synced_at: datetime.datetime) -> None:
+        """
+        Store issues to the cache.
+
+        Args:
+            issues (list): IssueData objects to store
+            synced_at (datetime.datetime): Time when the issues have been fetched
+        """
+
+        def iso(value) -> (str|None):
+            return value.isoformat() if value is not None else None
+
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(i.id, i.subject, i.assigned_to, iso(i.start_date), iso(i.due_date), iso(i.closed_on),
+              i.done_ratio, i.parent_id, iso(i.updated_on), synced_at.isoformat()) for i in issues])
+        self._conn.commit()
+
+    def touch(self, since: datetime.datetime, synced_at: datetime.datetime) -> None:
+        """
+        Mark cached issues as up to date, after all issues updated since 'since' have been stored.
+
+        Args:
+            since (datetime.datetime): Issues fetched at or after this time are marked
+            synced_at (datetime.datetime): New fetch time of the marked issues
+        """
+
+        self._conn.execute('UPDATE issues SET synced_at = ? WHERE synced_at >= ?', (synced_at.isoformat(), since.isoformat()))
+        self._conn.commit()
+
+    def load(self, ids: list, since: datetime.datetime|None=None) -> dict:
+        """
+        Load issues from the cache.
+
+        Args:
+            ids (list): Issue IDs to load
+            since (datetime.datetime|None): If specified, only issues fetched at or after this time are loaded
+
+        Returns:
+            dict: Dictionary of issues with issue ID as key and IssueData object as value, in the order of ids.
+                  Issues which are not in the cache are not included.
+        """
+
+        def date(value):
+            return datetime.date.fromisoformat(value) if value is not None else None
+
+        def date_time(value):
+            return datetime.datetime.fromisoformat(value) if value is not None else None
+
+        rows = dict()
+        # SQLite limits the number of host parameters in one statement
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i+500]
+            sql = f'SELECT * FROM issues WHERE id IN ({",".join("?" * len(chunk))})'
+            params = list(chunk)
+            if since is not None:
+                sql += ' AND synced_at >= ?'
+                params.append(since.isoformat())
+            for row in self._conn.execute(sql, params):
+                rows[row[0]] = row
+
+        issues_dict = dict()
+        for id in ids:
+            if id not in rows:
+                continue
+            row = rows[id]
+            issue_data = IssueData()
+            issue_data.id          = row[0]
+            issue_data.subject     = row[1]
+            issue_data.assigned_to = row[2]
+            issue_data.start_date  = date(row[3])
+            issue_data.due_date    = date(row[4])
+            issue_data.closed_on   = date_time(row[5])
+            issue_data.done_ratio  = row[6]
+            issue_data.parent_id   = row[7]
+            issue_data.updated_on  = date_time(row[8])
+            issues_dict[id] = issue_data
+
+        return issues_dict
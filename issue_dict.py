@@ -1,4 +1,8 @@
 class IssueData:
+    # No per-instance __dict__, it matters when tens of thousands of issues are kept in memory or pickled
+    __slots__ = ('id', 'subject', 'assigned_to', 'start_date', 'due_date', 'closed_on', 'done_ratio', 'updated_on',
+                 'parent_id', 'children_id')
+
     def __init__(self):
         self.id          = None
         self.subject     = None
@@ -7,7 +11,48 @@ class IssueData:
         self.due_date    = None
         self.closed_on   = None
         self.done_ratio  = None
+        self.updated_on  = None
 
         self.parent_id   = None
-        self.children_id = list()
+        self.children_id = ()  # shared empty tuple until the first child is added, most issues are leaves
+
+    def add_child(self, id: int) -> None:
+        """
+        Link a child issue.
+
+        Args:
+            id (int): Issue ID of the child
+        """
+
+        if not self.children_id:
+            self.children_id = [id]
+        else:
+            self.children_id.append(id)
+
+    def __getstate__(self) -> tuple:
+        # field values without names make the pickle for the rendering processes small
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def copy(self) -> 'IssueData':
+        """
+        Copy the issue without the links to its children.
+
+        Returns:
+            IssueData: Copied issue data
+        """
 
+        issue_data = IssueData()
+        issue_data.id          = self.id
+        issue_data.subject     = self.subject
+        issue_data.assigned_to = self.assigned_to
+        issue_data.start_date  = self.start_date
+        issue_data.due_date    = self.due_date
+        issue_data.closed_on   = self.closed_on
+        issue_data.done_ratio  = self.done_ratio
+        issue_data.updated_on  = self.updated_on
+        issue_data.parent_id   = self.parent_id
+        return issue_data
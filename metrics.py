@@ -0,0 +1,142 @@
+#
+# Phase timers, counters and peak memory of one run.
+#
+# The module level 'metrics' object is shared by all modules of the process.
+# Counters may be incremented from the fetch threads, so they are guarded by a lock.
+#
+
+import ctypes
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear all timers and counters, and restart the total time.
+        """
+
+        with self._lock:
+            self.timers   = dict()  # seconds spent in each phase
+            self.counters = dict()  # number of HTTP calls, issues, cells, bytes, etc.
+            self._start   = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Measure the time of the 'with' block. The time is added up if the phase is run more than once.
+
+        Args:
+            name (str): Phase name
+        """
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self.timers[name] = self.timers.get(name, 0.0) + elapsed
+
+    def count(self, name: str, n: int=1) -> None:
+        """
+        Add to the counter.
+
+        Args:
+            name (str): Counter name
+            n (int): Number to add
+        """
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, data: dict) -> None:
+        """
+        Add timers and counters measured in another process.
+
+        Args:
+            data (dict): 'timers' and 'counters' of the other process, see snapshot()
+        """
+
+        with self._lock:
+            for name, seconds in data.get('timers', {}).items():
+                self.timers[name] = self.timers.get(name, 0.0) + seconds
+            for name, n in data.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> dict:
+        """
+        Get timers and counters measured so far.
+
+        Returns:
+            dict: 'timers' and 'counters'
+        """
+
+        with self._lock:
+            return {'timers': dict(self.timers), 'counters': dict(self.counters)}
+
+    def summary(self) -> dict:
+        """
+        Get the summary of the run.
+
+        Returns:
+            dict: total time, time of each phase in seconds, counters and peak memory in bytes
+        """
+
+        data = self.snapshot()
+        return {
+            'total': round(time.perf_counter() - self._start, 3),
+            'phases': {name: round(seconds, 3) for name, seconds in data['timers'].items()},
+            'counters': data['counters'],
+            'peak_memory': peak_memory(),
+        }
+
+def peak_memory() -> (int|None):
+    """
+    Get the peak resident memory of this process.
+
+    Returns:
+        int: Peak memory in bytes
+        None: If it can't be got on this platform
+    """
+
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+    if sys.platform == 'win32':
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD),
+                        ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t),
+                        ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t),
+                        ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+
+    return None
+
+# global metrics of this process
+metrics = Metrics()
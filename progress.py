@@ -0,0 +1,114 @@
+#
+# Throttled progress reporting of fetching and writing.
+#
+# The module level 'progress' object is shared by all modules of the process.
+# Reports are passed to a callback at most every 'interval' seconds and every 'step' percent,
+# so reporting costs almost nothing per issue. Set another callback to use the progress as a library,
+# or None to turn it off.
+#
+
+import sys
+import time
+
+DEFAULT_INTERVAL = 0.2  # Minimum seconds between reports
+DEFAULT_STEP     = 1.0  # Minimum percent between reports
+
+def print_progress(stage: str, done: int, total: int|None, finished: bool) -> None:
+    """
+    Default callback, print the progress on one console line.
+
+    Args:
+        stage (str): Stage name ('fetch', 'ancestors' or 'write')
+        done (int): Number of done items
+        total (int|None): Number of all items, None if it is unknown
+        finished (bool): True on the last report of the stage
+    """
+
+    if total:
+        line = f'\r [ {int(done*100/total):3}% ] {stage} {done}/{total}'
+    else:
+        line = f'\r [ .... ] {stage} {done}'
+    print(line, end='\n' if finished else '', flush=True)
+
+class Progress:
+    def __init__(self, callback=None, interval: float=DEFAULT_INTERVAL, step: float=DEFAULT_STEP):
+        """
+        Args:
+            callback (callable|None): callback(stage, done, total, finished) to report, None not to report
+            interval (float): Minimum seconds between reports
+            step (float): Minimum percent between reports, when the total is known
+        """
+
+        self._callback = callback
+        self.interval  = interval
+        self.step      = step
+
+        self._stage        = None
+        self._total        = None
+        self._done         = 0
+        self._last_time    = 0.0
+        self._last_percent = 0.0
+
+    def set_callback(self, callback) -> None:
+        """
+        Change the callback.
+
+        Args:
+            callback (callable|None): callback(stage, done, total, finished) to report, None not to report
+        """
+
+        self._callback = callback
+
+    def start(self, stage: str, total: int|None=None) -> None:
+        """
+        Start a stage.
+
+        Args:
+            stage (str): Stage name
+            total (int|None): Number of all items, None if it is unknown
+        """
+
+        self._stage = stage
+        self._total = total
+        self._done = 0
+        self._last_percent = 0.0
+        if self._callback is not None:
+            self._last_time = time.monotonic()
+            self._callback(stage, 0, total, False)
+
+    def update(self, done: int) -> None:
+        """
+        Report the number of done items, if enough time and percent have passed since the last report.
+
+        Args:
+            done (int): Number of done items
+        """
+
+        self._done = done
+        if self._callback is None:
+            return
+
+        if self._total:
+            percent = done * 100 / self._total
+            if percent - self._last_percent < self.step:
+                return
+        now = time.monotonic()
+        if now - self._last_time < self.interval:
+            return
+
+        self._last_time = now
+        if self._total:
+            self._last_percent = percent
+        self._callback(self._stage, done, self._total, False)
+
+    def finish(self) -> None:
+        """
+        Finish the stage, the last report is always made.
+        """
+
+        if self._callback is not None and self._stage is not None:
+            self._callback(self._stage, self._done, self._total, True)
+        self._stage = None
+
+# global progress of this process, printed only on a terminal
+progress = Progress(print_progress if sys.stdout.isatty() else None)
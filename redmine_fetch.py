@@ -0,0 +1,183 @@
+#
+# Fetch issues from redmine with a bounded thread pool.
+#
+# All threads share one Redmine object, so HTTP connections are pooled and kept alive.
+# Issues are got from '/issues.json' directly and only the fields used by the gantt chart are parsed,
+# python-redmine is used for its session, authentication and error handling, but not for Resource objects.
+#
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+
+from redminelib import Redmine
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from issue_dict import IssueData
+from metrics import metrics
+from progress import progress
+
+logger = getLogger(__name__)
+
+PAGE_SIZE = 100           # Number of issues per page (maximum 'limit' of redmine REST API)
+ID_CHUNK_SIZE = 100       # Number of issue IDs to get in one Redmine API call (URL length limits)
+RETRY_TOTAL = 5           # Number of retries on 429/5xx responses and connection errors
+RETRY_BACKOFF = 0.5       # Backoff factor between retries (0.5, 1, 2, 4, ... seconds)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+def create_redmine(url: str, username: str|None, password: str|None, max_workers: int, api_key: str|None=None) -> Redmine:
+    """
+    Create Redmine object whose HTTP session is shared by all fetch threads.
+
+    Args:
+        url (str): Redmine server URL
+        username (str|None): Username for redmine account
+        password (str|None): Password for redmine account
+        max_workers (int): Number of worker threads, also used as connection pool size
+        api_key (str|None): API key for redmine account, it is used instead of username and password
+
+    Returns:
+        Redmine: Redmine object
+    """
+
+    redmine = Redmine(url, key=api_key, username=username, password=password)
+
+    retry = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUS,
+                  allowed_methods=frozenset(['GET']), respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+    redmine.engine.session.mount('http://', adapter)
+    redmine.engine.session.mount('https://', adapter)
+
+    return redmine
+
+def close_redmine(redmine: Redmine) -> None:
+    redmine.engine.session.close()
+
+def parse_issue(issue: dict) -> IssueData:
+    """
+    Convert an issue of the REST API response to IssueData.
+
+    Args:
+        issue (dict): Issue in '/issues.json' response
+
+    Returns:
+        IssueData: Issue data used to write the gantt chart
+    """
+
+    def date(value):
+        return datetime.date.fromisoformat(value) if value else None
+
+    def date_time(value):
+        # same as python-redmine, time in UTC without tzinfo
+        return datetime.datetime.fromisoformat(value.rstrip('Z')) if value else None
+
+    assigned_to = issue.get('assigned_to')
+    parent = issue.get('parent')
+
+    issue_data = IssueData()
+    issue_data.id          = issue['id']
+    issue_data.subject     = issue.get('subject')
+    issue_data.assigned_to = assigned_to['name'] if assigned_to else None
+    issue_data.start_date  = date(issue.get('start_date'))
+    issue_data.due_date    = date(issue.get('due_date'))
+    issue_data.closed_on   = date_time(issue.get('closed_on'))
+    issue_data.done_ratio  = issue.get('done_ratio')
+    issue_data.parent_id   = parent['id'] if parent else None
+    issue_data.updated_on  = date_time(issue.get('updated_on'))
+
+    return issue_data
+
+def get_issues_page(redmine, params: dict, offset: int, limit: int=PAGE_SIZE) -> tuple:
+    """
+    Get one page of '/issues.json'.
+
+    Args:
+        redmine (Redmine): Redmine object
+        params (dict): Query parameters (filter conditions)
+        offset (int): Offset of the page
+        limit (int): Number of issues of the page
+
+    Returns:
+        tuple: (IssueData list of the page, total count of issues which match the parameters)
+    """
+
+    response = redmine.engine.request('get', f'{redmine.url}/issues.json', params=dict(params, offset=offset, limit=limit))
+    metrics.count('http_calls')
+    issues = [parse_issue(issue) for issue in response['issues']]
+    metrics.count('issues_fetched', len(issues))
+    return issues, response.get('total_count', 0)
+
+def count_filter_issues(redmine, filter: dict) -> int:
+    """
+    Get the number of issues which match the filter, with a request of one issue.
+
+    Args:
+        redmine (Redmine): Redmine object
+        filter (dict): Filter conditions for searching issues
+
+    Returns:
+        int: Total count of issues which match the filter
+    """
+
+    return get_issues_page(redmine, filter, 0, 1)[1]
+
+def fetch_filter_issues(redmine, filter: dict, max_workers: int) -> list:
+    """
+    Get all pages of the filter result.
+    The first page tells the total count, and the remaining pages are fetched in parallel.
+
+    Args:
+        redmine (Redmine): Redmine object
+        filter (dict): Filter conditions for searching issues
+        max_workers (int): Number of worker threads
+
+    Returns:
+        list: IssueData objects in the order of the filter result
+    """
+
+    def get_page(offset: int) -> list:
+        return get_issues_page(redmine, filter, offset)[0]
+
+    issues, total_count = get_issues_page(redmine, filter, 0)
+
+    offsets = range(PAGE_SIZE, total_count, PAGE_SIZE)
+    progress.start('fetch', len(offsets)+1)
+    progress.update(1)
+    if offsets:
+        logger.debug(f'Fetch {len(offsets)} more pages with {max_workers} workers')
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for done, page in enumerate(executor.map(get_page, offsets), 2):
+                issues.extend(page)
+                progress.update(done)
+    progress.finish()
+
+    return issues
+
+def fetch_issues_by_id(redmine, ids: list, max_workers: int) -> list:
+    """
+    Get issues by ID in chunks of ID_CHUNK_SIZE, the chunks are fetched in parallel.
+
+    Args:
+        redmine (Redmine): Redmine object
+        ids (list): Issue IDs to get
+        max_workers (int): Number of worker threads
+
+    Returns:
+        list: IssueData objects
+    """
+
+    def get_chunk(chunk: list) -> list:
+        # status_id='*' is needed, otherwise closed issues are not returned
+        return get_issues_page(redmine, {'issue_id': ','.join(str(id) for id in chunk), 'status_id': '*'}, 0, len(chunk))[0]
+
+    chunks = [ids[i:i+ID_CHUNK_SIZE] for i in range(0, len(ids), ID_CHUNK_SIZE)]
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [issue for chunk in chunks for issue in get_chunk(chunk)]
+
+    issues = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(get_chunk, chunks):
+            issues.extend(result)
+
+    return issues
@@ -0,0 +1,193 @@
+#
+# Fetch issues from redmine with asyncio (optional backend, needs httpx).
+#
+# Pages of the filter result and chunks of issue IDs are requested concurrently on one event loop,
+# the number of requests in flight is limited by a semaphore of 'max_workers'.
+# It has the same functions as redmine_fetch, so the rest of the pipeline doesn't depend on the backend.
+#
+
+import asyncio
+from logging import getLogger
+
+import httpx
+
+from metrics import metrics
+from progress import progress
+from redmine_fetch import ID_CHUNK_SIZE, PAGE_SIZE, RETRY_BACKOFF, RETRY_STATUS, RETRY_TOTAL, parse_issue
+
+logger = getLogger(__name__)
+
+class AsyncRedmine:
+    def __init__(self, url: str, username: str|None, password: str|None, max_workers: int, api_key: str|None=None,
+                 transport: httpx.AsyncBaseTransport|None=None):
+        """
+        Open the HTTP client and the event loop used by all requests of the run.
+
+        Args:
+            url (str): Redmine server URL
+            username (str|None): Username for redmine account
+            password (str|None): Password for redmine account
+            max_workers (int): Maximum number of requests in flight
+            api_key (str|None): API key for redmine account, it is used instead of username and password
+            transport (httpx.AsyncBaseTransport|None): Transport to use instead of network, e.g. httpx.MockTransport
+        """
+
+        # same authentication as python-redmine
+        headers = dict()
+        auth = None
+        if api_key is not None:
+            headers['X-Redmine-API-Key'] = api_key
+        elif username is not None and password is not None:
+            auth = (username, password)
+
+        if transport is None:
+            limits = httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+
+        self._runner = asyncio.Runner()
+        self._client = httpx.AsyncClient(base_url=url, headers=headers, auth=auth, transport=transport)
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    def run(self, coroutine):
+        """
+        Run the coroutine on the event loop of this client.
+
+        Args:
+            coroutine (coroutine): Coroutine to run
+
+        Returns:
+            Result of the coroutine
+        """
+
+        return self._runner.run(coroutine)
+
+    def close(self) -> None:
+        self._runner.run(self._client.aclose())
+        self._runner.close()
+
+    async def get_issues_page(self, params: dict, offset: int, limit: int=PAGE_SIZE) -> tuple:
+        """
+        Get one page of '/issues.json'. 429/5xx responses and connection errors are retried with backoff.
+
+        Args:
+            params (dict): Query parameters (filter conditions)
+            offset (int): Offset of the page
+            limit (int): Number of issues of the page
+
+        Returns:
+            tuple: (IssueData list of the page, total count of issues which match the parameters)
+        """
+
+        async with self._semaphore:
+            for attempt in range(RETRY_TOTAL+1):
+                delay = RETRY_BACKOFF * (2 ** attempt)
+                try:
+                    response = await self._client.get('/issues.json', params=dict(params, offset=offset, limit=limit))
+                except httpx.TransportError:
+                    if attempt == RETRY_TOTAL:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                metrics.count('http_calls')
+                if response.status_code in RETRY_STATUS and attempt < RETRY_TOTAL:
+                    retry_after = response.headers.get('Retry-After', '')
+                    await asyncio.sleep(float(retry_after) if retry_after.isdigit() else delay)
+                    continue
+                response.raise_for_status()
+                break
+
+        data = response.json()
+        issues = [parse_issue(issue) for issue in data['issues']]
+        metrics.count('issues_fetched', len(issues))
+        return issues, data.get('total_count', 0)
+
+def create_redmine(url: str, username: str|None, password: str|None, max_workers: int, api_key: str|None=None,
+                   transport: httpx.AsyncBaseTransport|None=None) -> AsyncRedmine:
+    """
+    Create the asyncio redmine client.
+
+    Args:
+        url (str): Redmine server URL
+        username (str|None): Username for redmine account
+        password (str|None): Password for redmine account
+        max_workers (int): Maximum number of requests in flight
+        api_key (str|None): API key for redmine account, it is used instead of username and password
+        transport (httpx.AsyncBaseTransport|None): Transport to use instead of network, e.g. httpx.MockTransport
+
+    Returns:
+        AsyncRedmine: Redmine client
+    """
+
+    return AsyncRedmine(url, username, password, max_workers, api_key, transport)
+
+def close_redmine(redmine: AsyncRedmine) -> None:
+    redmine.close()
+
+def count_filter_issues(redmine: AsyncRedmine, filter: dict) -> int:
+    """
+    Get the number of issues which match the filter, with a request of one issue.
+
+    Args:
+        redmine (AsyncRedmine): Redmine client
+        filter (dict): Filter conditions for searching issues
+
+    Returns:
+        int: Total count of issues which match the filter
+    """
+
+    return redmine.run(redmine.get_issues_page(filter, 0, 1))[1]
+
+def fetch_filter_issues(redmine: AsyncRedmine, filter: dict, max_workers: int) -> list:
+    """
+    Get all pages of the filter result.
+    The first page tells the total count, and the remaining pages are requested concurrently.
+
+    Args:
+        redmine (AsyncRedmine): Redmine client
+        filter (dict): Filter conditions for searching issues
+        max_workers (int): Not used, requests in flight are limited by the client
+
+    Returns:
+        list: IssueData objects in the order of the filter result
+    """
+
+    async def fetch() -> list:
+        issues, total_count = await redmine.get_issues_page(filter, 0)
+
+        offsets = range(PAGE_SIZE, total_count, PAGE_SIZE)
+        progress.start('fetch', len(offsets)+1)
+        progress.update(1)
+        tasks = [asyncio.ensure_future(redmine.get_issues_page(filter, offset)) for offset in offsets]
+        for done, task in enumerate(asyncio.as_completed(tasks), 2):
+            await task
+            progress.update(done)
+        progress.finish()
+
+        for task in tasks:
+            issues.extend(task.result()[0])
+        return issues
+
+    return redmine.run(fetch())
+
+def fetch_issues_by_id(redmine: AsyncRedmine, ids: list, max_workers: int) -> list:
+    """
+    Get issues by ID in chunks of ID_CHUNK_SIZE, the chunks are requested concurrently.
+
+    Args:
+        redmine (AsyncRedmine): Redmine client
+        ids (list): Issue IDs to get
+        max_workers (int): Not used, requests in flight are limited by the client
+
+    Returns:
+        list: IssueData objects
+    """
+
+    async def fetch() -> list:
+        # status_id='*' is needed, otherwise closed issues are not returned
+        chunks = [ids[i:i+ID_CHUNK_SIZE] for i in range(0, len(ids), ID_CHUNK_SIZE)]
+        pages = await asyncio.gather(*[
+            redmine.get_issues_page({'issue_id': ','.join(str(id) for id in chunk), 'status_id': '*'}, 0, len(chunk))
+            for chunk in chunks])
+        return [issue for issues, total_count in pages for issue in issues]
+
+    return redmine.run(fetch())
@@ -0,0 +1,38 @@
+#
+# Bookkeeping of issues during one run of gantt chart generation.
+#
+
+class RunState:
+    def __init__(self):
+        self.targeted_id   = set()  # Issue IDs those are extracted to process
+        self.registered_id = set()  # Issue IDs those have been registered in excel already
+
+    def is_targeted(self, id: int) -> bool:
+        """
+        Check if the issue is extracted by the filter, not an ancestor of them.
+
+        Args:
+            id (int): Issue ID
+
+        Returns:
+            bool: True if the issue is a target issue
+        """
+
+        return id in self.targeted_id
+
+    def register(self, id: int) -> bool:
+        """
+        Register the issue as written in excel.
+
+        Args:
+            id (int): Issue ID
+
+        Returns:
+            bool: True if the issue is newly registered, False if it has been registered already
+        """
+
+        if id in self.registered_id:
+            return False
+
+        self.registered_id.add(id)
+        return True
@@ -0,0 +1,143 @@
+#
+# Snapshot of the fetched issues for offline re-rendering.
+#
+# The issues of each job are saved after their ancestors are resolved, with the target issue IDs and the links
+# to children, so the gantt charts can be rendered again without redmine (e.g. with another font or date range).
+# The file is gzip'd JSON lines:
+#   header : {"format": "excel-gantt-from-redmine snapshot", "version": 1, "created": ..., "url": ...}
+#   job    : {"job": index, "project_name": ..., "tab_title": ..., "targets": [IDs], "issues": number of issues}
+#   issue  : [values of IssueData.__slots__], as many lines as "issues" of the job, in the order of the issues dictionary
+#
+
+import datetime
+import gzip
+import json
+
+from issue_dict import IssueData
+from run_state import RunState
+
+SNAPSHOT_FORMAT = 'excel-gantt-from-redmine snapshot'
+SNAPSHOT_VERSION = 1
+
+# fields of IssueData saved as ISO format strings
+DATE_FIELDS     = frozenset(('start_date', 'due_date'))
+DATETIME_FIELDS = frozenset(('closed_on', 'updated_on'))
+
+class SnapshotWriter:
+    def __init__(self, path: str, url: str|None):
+        """
+        Create the snapshot file and write the header.
+
+        Args:
+            path (str): Snapshot file path
+            url (str|None): Redmine server URL, for information
+        """
+
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._jobs = 0
+        self._write({'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION,
+                     'created': datetime.datetime.now().astimezone().isoformat(timespec='seconds'), 'url': url})
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _write(self, value) -> None:
+        self._file.write(json.dumps(value, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def write_job(self, project_name: str|None, tab_title: str|None, state: RunState, issues_dict: dict|None) -> None:
+        """
+        Write the issues of a job. It must be called for every job in order, also for jobs without issues.
+
+        Args:
+            project_name (str|None): Project name of the job, for information
+            tab_title (str|None): Tab title of the job, for information
+            state (RunState): target issues of the job
+            issues_dict (dict|None): Dictionary of target and ancestor issues, None if no issues are found
+        """
+
+        issues = list(issues_dict.values()) if issues_dict else []
+        self._write({'job': self._jobs, 'project_name': project_name, 'tab_title': tab_title,
+                     'targets': sorted(state.targeted_id), 'issues': len(issues)})
+        self._jobs += 1
+
+        for issue_data in issues:
+            values = list(issue_data.__getstate__())
+            for index, name in enumerate(IssueData.__slots__):
+                if values[index] is None:
+                    continue
+                if name in DATE_FIELDS or name in DATETIME_FIELDS:
+                    values[index] = values[index].isoformat()
+                elif name == 'children_id':
+                    values[index] = list(values[index])
+            self._write(values)
+
+class SnapshotReader:
+    def __init__(self, path: str):
+        """
+        Open the snapshot file and check the header.
+
+        Args:
+            path (str): Snapshot file path
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file is not a snapshot of a supported version
+        """
+
+        self._file = gzip.open(path, 'rt', encoding='utf-8')
+        try:
+            header = json.loads(self._file.readline() or 'null')
+        except (OSError, ValueError):
+            self._file.close()
+            raise ValueError('not a snapshot file')
+        if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT:
+            self._file.close()
+            raise ValueError('not a snapshot file')
+        if header.get('version') != SNAPSHOT_VERSION:
+            self._file.close()
+            raise ValueError(f"unsupported snapshot version {header.get('version')}")
+        self.header = header
+
+    def close(self) -> None:
+        self._file.close()
+
+    def read_job(self) -> (tuple|None):
+        """
+        Read the issues of the next job.
+
+        Returns:
+            tuple: (job information dictionary, RunState with the target issues, dictionary of issues or None if the job had no issues)
+            None: If there are no more jobs
+
+        Raises:
+            ValueError: If the file is broken
+        """
+
+        line = self._file.readline()
+        if not line:
+            return None
+        job = json.loads(line)
+
+        state = RunState()
+        state.targeted_id.update(job['targets'])
+
+        issues_dict = dict()
+        for _ in range(job['issues']):
+            line = self._file.readline()
+            if not line:
+                raise ValueError('snapshot file is truncated')
+            values = json.loads(line)
+            for index, name in enumerate(IssueData.__slots__):
+                if values[index] is None:
+                    continue
+                if name in DATE_FIELDS:
+                    values[index] = datetime.date.fromisoformat(values[index])
+                elif name in DATETIME_FIELDS:
+                    values[index] = datetime.datetime.fromisoformat(values[index])
+                elif name == 'children_id' and not values[index]:
+                    values[index] = ()  # shared empty tuple as IssueData
+            issue_data = IssueData()
+            issue_data.__setstate__(values)
+            issues_dict[issue_data.id] = issue_data
+
+        return job, state, (issues_dict if issues_dict else None)
@@ -0,0 +1,54 @@
+#
+# Tests of building the issue forest and the row order.
+#
+# Run: python -m unittest discover tests
+#
+
+import unittest
+
+from hierarchy import build_hierarchy
+from issue_dict import IssueData
+
+def make_issues(parents: dict) -> dict:
+    """
+    Make issues without linked children.
+
+    Args:
+        parents (dict): Parent issue ID (or None) of each issue ID, in the order of the issue dictionary
+
+    Returns:
+        dict: Dictionary of issues with issue ID as key and IssueData object as value
+    """
+
+    issues_dict = dict()
+    for id, parent_id in parents.items():
+        issue_data = IssueData()
+        issue_data.id = id
+        issue_data.parent_id = parent_id
+        issues_dict[id] = issue_data
+    return issues_dict
+
+def rows(issues_dict: dict) -> list:
+    return [(issue_data.id, indent) for issue_data, indent in build_hierarchy(issues_dict).rows]
+
+class BuildHierarchyTest(unittest.TestCase):
+    def test_children_from_parent_id(self):
+        self.assertEqual(rows(make_issues({1: None, 2: 1})), [(1, 0), (2, 1)])
+
+    def test_depth_first_in_dictionary_order(self):
+        # targets first, their ancestors after them as collect_issues makes it
+        issues_dict = make_issues({5: 2, 4: 3, 6: 2, 2: 1, 3: 1, 1: None, 7: None})
+        self.assertEqual(rows(issues_dict), [(1, 0), (2, 1), (5, 2), (6, 2), (3, 1), (4, 2), (7, 0)])
+
+    def test_missing_parent_is_topmost(self):
+        with self.assertLogs('hierarchy', 'WARNING'):
+            self.assertEqual(rows(make_issues({2: 1, 3: 2})), [(2, 0), (3, 1)])
+
+    def test_cycle_is_broken(self):
+        with self.assertLogs('hierarchy', 'WARNING'):
+            result = rows(make_issues({1: 2, 2: 1, 3: 1}))
+        self.assertEqual(sorted(id for id, indent in result), [1, 2, 3])
+        self.assertEqual(result[0][1], 0)
+
+if __name__ == '__main__':
+    unittest.main()
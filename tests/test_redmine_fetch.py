@@ -0,0 +1,162 @@
+#
+# Tests of fetching issues from '/issues.json' against a local stub redmine.
+#
+# Run: python -m unittest discover tests
+#
+
+import datetime
+import json
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import redmine_fetch
+from redmine_fetch import ID_CHUNK_SIZE, PAGE_SIZE
+
+class StubRedmine:
+    def __init__(self, issues: list):
+        """
+        Start a local stub redmine which serves '/issues.json' of the issues.
+        It supports issue_id, sort ('id' or 'id:desc'), offset and limit parameters.
+
+        Args:
+            issues (list): Issues in the form of '/issues.json' response
+        """
+
+        self.issues = issues
+        self.requests = []       # query parameters of each request
+        self.failures = 0        # number of requests to answer with 503 before serving
+        self.slow_offsets = ()   # offsets of the pages answered late, to finish pages out of order
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                query = dict(urllib.parse.parse_qsl(url.query))
+                with stub._lock:
+                    stub.requests.append(query)
+                    fail = stub.failures > 0
+                    if fail:
+                        stub.failures -= 1
+                if fail:
+                    self.send_error(503)
+                    return
+
+                if 'issue_id' in query:
+                    ids = {int(id) for id in query['issue_id'].split(',')}
+                    selected = [issue for issue in stub.issues if issue['id'] in ids]
+                else:
+                    selected = list(stub.issues)
+                if query.get('sort') == 'id:desc':
+                    selected.sort(key=lambda issue: issue['id'], reverse=True)
+                elif query.get('sort') == 'id':
+                    selected.sort(key=lambda issue: issue['id'])
+
+                offset = int(query.get('offset', 0))
+                limit = int(query.get('limit', 25))
+                if offset in stub.slow_offsets:
+                    time.sleep(0.2)
+                body = json.dumps({'issues': selected[offset:offset+limit], 'total_count': len(selected),
+                                   'offset': offset, 'limit': limit}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def make_issue(id: int) -> dict:
+    return {'id': id, 'subject': f'Issue {id}', 'assigned_to': {'id': 1, 'name': 'User 1'},
+            'start_date': '2025-10-01', 'due_date': '2025-10-20', 'done_ratio': 10,
+            'updated_on': '2025-10-01T09:00:00Z'}
+
+class RedmineFetchTest(unittest.TestCase):
+    def start(self, issues: list) -> StubRedmine:
+        stub = StubRedmine(issues)
+        self.addCleanup(stub.close)
+        redmine = redmine_fetch.create_redmine(stub.url, None, None, 4)
+        self.addCleanup(redmine_fetch.close_redmine, redmine)
+        return stub, redmine
+
+    def test_pages_keep_filter_order(self):
+        stub, redmine = self.start([make_issue(id) for id in range(1, 2*PAGE_SIZE+51)])
+        # the second page finishes last
+        stub.slow_offsets = (PAGE_SIZE,)
+
+        issues = redmine_fetch.fetch_filter_issues(redmine, {'sort': 'id:desc'}, 4)
+
+        self.assertEqual([issue.id for issue in issues], list(range(2*PAGE_SIZE+50, 0, -1)))
+        self.assertEqual(sorted(int(query['offset']) for query in stub.requests), [0, PAGE_SIZE, 2*PAGE_SIZE])
+        self.assertTrue(all(query['sort'] == 'id:desc' for query in stub.requests))
+
+    def test_issue_ids_in_chunks_with_all_statuses(self):
+        stub, redmine = self.start([make_issue(id) for id in range(1, 2*ID_CHUNK_SIZE+31)])
+        ids = list(range(1, 2*ID_CHUNK_SIZE+31))
+
+        issues = redmine_fetch.fetch_issues_by_id(redmine, ids, 4)
+
+        self.assertEqual(sorted(issue.id for issue in issues), ids)
+        self.assertEqual(len(stub.requests), 3)
+        requested = []
+        for query in stub.requests:
+            chunk = [int(id) for id in query['issue_id'].split(',')]
+            self.assertLessEqual(len(chunk), ID_CHUNK_SIZE)
+            self.assertEqual(int(query['limit']), len(chunk))
+            self.assertEqual(query['status_id'], '*')
+            requested += chunk
+        self.assertEqual(sorted(requested), ids)
+
+    def test_missing_fields_are_none(self):
+        stub, redmine = self.start([{'id': 1, 'subject': 'Bare issue'}])
+
+        issue_data = redmine_fetch.fetch_filter_issues(redmine, {}, 1)[0]
+
+        self.assertEqual(issue_data.id, 1)
+        self.assertEqual(issue_data.subject, 'Bare issue')
+        for name in ('assigned_to', 'parent_id', 'start_date', 'due_date', 'closed_on', 'done_ratio', 'updated_on'):
+            self.assertIsNone(getattr(issue_data, name), name)
+
+    def test_fields_are_parsed(self):
+        issue = make_issue(2)
+        issue['parent'] = {'id': 1}
+        issue['closed_on'] = '2025-10-21T03:04:05Z'
+        stub, redmine = self.start([issue])
+
+        issue_data = redmine_fetch.fetch_filter_issues(redmine, {}, 1)[0]
+
+        self.assertEqual(issue_data.assigned_to, 'User 1')
+        self.assertEqual(issue_data.parent_id, 1)
+        self.assertEqual(issue_data.start_date, datetime.date(2025, 10, 1))
+        self.assertEqual(issue_data.due_date, datetime.date(2025, 10, 20))
+        self.assertEqual(issue_data.done_ratio, 10)
+        # time in UTC without tzinfo, as python-redmine
+        self.assertEqual(issue_data.closed_on, datetime.datetime(2025, 10, 21, 3, 4, 5))
+        self.assertIsNone(issue_data.closed_on.tzinfo)
+        self.assertEqual(issue_data.updated_on, datetime.datetime(2025, 10, 1, 9, 0, 0))
+        self.assertIsNone(issue_data.updated_on.tzinfo)
+
+    def test_unavailable_is_retried(self):
+        stub, redmine = self.start([make_issue(1)])
+        stub.failures = 1
+
+        issues = redmine_fetch.fetch_filter_issues(redmine, {}, 1)
+
+        self.assertEqual([issue.id for issue in issues], [1])
+        self.assertEqual(len(stub.requests), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#
+# Tests of the asyncio fetch backend with httpx.MockTransport (skipped if httpx is not installed).
+#
+# Run: python -m unittest discover tests
+#
+
+import asyncio
+import importlib.util
+import unittest
+
+from redmine_fetch import ID_CHUNK_SIZE, PAGE_SIZE
+
+if importlib.util.find_spec('httpx') is not None:
+    import httpx
+
+    import redmine_fetch_async
+
+def make_issue(id: int) -> dict:
+    return {'id': id, 'subject': f'Issue {id}', 'start_date': '2025-10-01', 'due_date': '2025-10-20',
+            'done_ratio': 10, 'updated_on': '2025-10-01T09:00:00Z'}
+
+@unittest.skipIf(importlib.util.find_spec('httpx') is None, 'httpx is not installed')
+class AsyncFetchTest(unittest.TestCase):
+    def start(self, issues: list, responses: list|None=None, slow_offsets: tuple=()):
+        """
+        Create the client on a mock redmine which serves '/issues.json' of the issues.
+
+        Args:
+            issues (list): Issues in the form of '/issues.json' response
+            responses (list|None): (status code, headers) answered to the first requests before serving
+            slow_offsets (tuple): Offsets of the pages answered late, to finish pages out of order
+
+        Returns:
+            tuple: (AsyncRedmine, list of query parameters of each request)
+        """
+
+        requests = []
+        responses = list(responses or [])
+
+        async def handler(request):
+            query = dict(request.url.params)
+            requests.append(query)
+            if responses:
+                status_code, headers = responses.pop(0)
+                return httpx.Response(status_code, headers=headers)
+
+            if 'issue_id' in query:
+                ids = {int(id) for id in query['issue_id'].split(',')}
+                selected = [issue for issue in issues if issue['id'] in ids]
+            else:
+                selected = issues
+            offset = int(query.get('offset', 0))
+            limit = int(query.get('limit', 25))
+            if offset in slow_offsets:
+                await asyncio.sleep(0.2)
+            return httpx.Response(200, json={'issues': selected[offset:offset+limit], 'total_count': len(selected),
+                                             'offset': offset, 'limit': limit})
+
+        redmine = redmine_fetch_async.create_redmine('http://redmine.test', None, None, 4,
+                                                     transport=httpx.MockTransport(handler))
+        self.addCleanup(redmine_fetch_async.close_redmine, redmine)
+        return redmine, requests
+
+    def test_pages_keep_filter_order(self):
+        issues = [make_issue(id) for id in range(2*PAGE_SIZE+50, 0, -1)]
+        # the second page finishes last
+        redmine, requests = self.start(issues, slow_offsets=(PAGE_SIZE,))
+
+        result = redmine_fetch_async.fetch_filter_issues(redmine, {'sort': 'id:desc'}, 4)
+
+        self.assertEqual([issue.id for issue in result], [issue['id'] for issue in issues])
+        self.assertEqual(sorted(int(query['offset']) for query in requests), [0, PAGE_SIZE, 2*PAGE_SIZE])
+        self.assertTrue(all(query['sort'] == 'id:desc' for query in requests))
+
+    def test_issue_ids_in_chunks_with_all_statuses(self):
+        ids = list(range(1, 2*ID_CHUNK_SIZE+31))
+        redmine, requests = self.start([make_issue(id) for id in ids])
+
+        result = redmine_fetch_async.fetch_issues_by_id(redmine, ids, 4)
+
+        self.assertEqual(sorted(issue.id for issue in result), ids)
+        self.assertEqual(len(requests), 3)
+        requested = []
+        for query in requests:
+            chunk = [int(id) for id in query['issue_id'].split(',')]
+            self.assertLessEqual(len(chunk), ID_CHUNK_SIZE)
+            self.assertEqual(int(query['limit']), len(chunk))
+            self.assertEqual(query['status_id'], '*')
+            requested += chunk
+        self.assertEqual(sorted(requested), ids)
+
+    def test_unavailable_and_too_many_requests_are_retried(self):
+        redmine, requests = self.start([make_issue(1)], responses=[(503, {'Retry-After': '0'}), (429, {'Retry-After': '0'})])
+
+        result = redmine_fetch_async.fetch_filter_issues(redmine, {}, 4)
+
+        self.assertEqual([issue.id for issue in result], [1])
+        self.assertEqual(len(requests), 3)
+
+    def test_count_of_filter(self):
+        redmine, requests = self.start([make_issue(id) for id in range(1, 8)])
+
+        self.assertEqual(redmine_fetch_async.count_filter_issues(redmine, {}), 7)
+        self.assertEqual(requests[0]['limit'], '1')
+
+if __name__ == '__main__':
+    unittest.main()